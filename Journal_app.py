@@ -1,6 +1,8 @@
 import streamlit as st
-from time import sleep
 from navigation import make_sidebar
+from timing import finish_run
+from prewarm import start_prefetch
+from memory import RELEASED_KEY, render_resume
 
 st.set_page_config(page_title="Trading Dashboard", layout="centered")
 
@@ -8,21 +10,29 @@ make_sidebar()
 
 st.title("Welcome to Your Trading Journal")
 
-st.write("Please log in to continue (username `admin`, password `admin`).")
+# A logged-in session whose trade log was released while it was idle waits here
+if st.session_state.get("logged_in", False) and RELEASED_KEY in st.session_state:
+    render_resume()
+else:
+    st.write("Please log in to continue (username `admin`, password `admin`).")
 
-# Create a form for login
-with st.form(key="login_form"):
-    username = st.text_input("Username")
-    password = st.text_input("Password", type="password")
+    if st.session_state.pop("logged_out", False):
+        st.info("Logged out successfully!")
 
-    # Form submission button
-    submit_button = st.form_submit_button(label="Log in")
+    # Create a form for login
+    with st.form(key="login_form"):
+        username = st.text_input("Username")
+        password = st.text_input("Password", type="password")
 
-    if submit_button:
-        if username == "admin" and password == "admin":
-            st.session_state.logged_in = True
-            st.success("Logged in successfully!")
-            sleep(0.5)
-            st.switch_page("pages/Journal.py")
-        else:
-            st.error("Incorrect username or password")
\ No newline at end of file
+        # Form submission button
+        submit_button = st.form_submit_button(label="Log in")
+
+        if submit_button:
+            if username == "admin" and password == "admin":
+                st.session_state.logged_in = True
+                start_prefetch()
+                st.switch_page("pages/Journal.py")
+            else:
+                st.error("Incorrect username or password")
+
+finish_run()
@@ -0,0 +1,39 @@
+import argparse
+import json
+
+
+def load_results(path):
+    with open(path) as results_file:
+        report = json.load(results_file)
+    return report, {(row["name"], row["trades"]): row for row in report["results"]}
+
+
+def _ratio(new, old):
+    if new is None or not old:
+        return ""
+    return f"{new / old:6.2f}x"
+
+
+# Side-by-side timings and peak memory of two benchmark runs, e.g. before and after a
+# change: python -m bench.compare bench/results/<old>.json bench/results/<new>.json
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    args = parser.parse_args(argv)
+
+    old_report, old = load_results(args.old)
+    new_report, new = load_results(args.new)
+    print(f"old: {(old_report['commit'] or '?')[:8]}  new: {(new_report['commit'] or '?')[:8]}")
+    print(f"{'benchmark':<28} {'trades':>11} {'old s':>9} {'new s':>9} {'time':>7} {'memory':>7}")
+    for key in sorted(old.keys() & new.keys(), key=lambda key: (key[1], key[0])):
+        before, after = old[key], new[key]
+        print(f"{key[0]:<28} {key[1]:>11,} {before['seconds']:9.3f} {after['seconds']:9.3f} "
+              f"{_ratio(after['seconds'], before['seconds']):>7} "
+              f"{_ratio(after['peak_mb'], before['peak_mb']):>7}")
+    for key in sorted(old.keys() ^ new.keys()):
+        print(f"{key[0]:<28} {key[1]:>11,}  only in {'old' if key in old else 'new'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+from bench.run import REPO_DIR
+
+# Import-time audit: what importing the app's modules and the pages' imports costs a
+# server process that has Streamlit loaded already.
+#   python -m bench.imports
+# Uses python -X importtime in a fresh interpreter; times are in milliseconds.
+PAGE_SCRIPTS = ["Journal_app.py"] + [os.path.join("pages", name) for name in
+                                     sorted(os.listdir(os.path.join(REPO_DIR, "pages")))
+                                     if name.endswith(".py")]
+# Imported through lazy_imports on first use rather than by the pages
+DEFERRED = ["plotly.express", "requests"]
+
+
+# Modules imported at the top level of a script, in order
+def script_imports(path):
+    with open(os.path.join(REPO_DIR, path), encoding="utf-8") as script:
+        tree = ast.parse(script.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+    return list(dict.fromkeys(names))
+
+
+# (module, self ms, cumulative ms) for every module imported after Streamlit
+def import_times(modules):
+    code = "import streamlit\n" + "".join(f"import {module}\n" for module in modules)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_DIR,
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    rows = []
+    after_streamlit = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # Header line
+        if name.strip() == "streamlit" and name == name.rstrip() and not after_streamlit:
+            after_streamlit = True
+            continue
+        if after_streamlit:
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            rows.append((name.strip(), depth, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time audit of the app.")
+    parser.add_argument("--top", type=int, default=25, help="slowest modules to list")
+    args = parser.parse_args(argv)
+
+    modules = []
+    for script in PAGE_SCRIPTS:
+        modules += script_imports(script)
+    modules = list(dict.fromkeys(modules))
+    rows = import_times(modules + DEFERRED)
+
+    # Top-level rows are what each import statement costs the first time it runs
+    print(f"{'imported by the app':<40} {'cumulative ms':>14}")
+    for name, depth, self_ms, cumulative_ms in rows:
+        if depth == 0:
+            label = f"{name} (deferred)" if name in DEFERRED else name
+            print(f"{label:<40} {cumulative_ms:14.1f}")
+    print(f"{'total at page load':<40} "
+          f"{sum(row[3] for row in rows if row[1] == 0 and row[0] not in DEFERRED):14.1f}")
+
+    print(f"\n{'slowest modules (self time)':<40} {'self ms':>14}")
+    for name, depth, self_ms, cumulative_ms in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f"{name:<40} {self_ms:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
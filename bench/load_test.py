@@ -0,0 +1,340 @@
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from tornado.websocket import websocket_connect
+
+from bench.run import REPO_DIR, RESULTS_DIR, ensure_dataset, git_commit
+from bench.synthetic import parse_size
+
+# Simulated traders against one real server process:
+#   python -m bench.load_test --sessions 1 4 16 32 --steps 30 --trades 10k
+# Each level starts N sessions at once; every session logs in through the login form,
+# then browses the four pages for the given number of steps. The server runs in its
+# own process (a scratch working directory, the synthetic log as its tradelog), so its
+# RSS is the app's alone. AppTest can't be used here: it swaps process-wide Streamlit
+# state on every run, so two AppTest sessions can't run at the same time.
+# Streamlit keeps the state of disconnected sessions for a while, so sessions of
+# earlier levels still count in the "live" column and the server's RSS.
+APP_PATH = os.path.join(REPO_DIR, "Journal_app.py")
+SERVER_START_TIMEOUT = 60
+# Seconds one rerun may take before the session gives up
+RERUN_TIMEOUT = 300
+
+# Share of steps going to each page, and what a trader does once there
+PAGE_WEIGHTS = {"Journal": 0.35, "Dashboard": 0.3, "Reporting": 0.2, "Calendar": 0.15}
+# Interactions on the page after a visit: 0, 1 or 2 of them
+MAX_INTERACTIONS = 2
+
+WIDGET_VALUE = {"button": "trigger_value", "number_input": "double_value",
+                "radio": "int_value", "selectbox": "int_value", "text_input": "string_value"}
+
+METRIC_LINE = re.compile(r"^(\w+)(\{[^}]*\})? (\S+)$")
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+def start_server(tradelog_path, workdir, port, metrics_port):
+    env = dict(os.environ, JOURNAL_TRADELOG_SOURCE=tradelog_path,
+               JOURNAL_METRICS_PORT=str(metrics_port))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH, "--server.headless", "true",
+         "--server.port", str(port), "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("Streamlit server exited during startup")
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("Streamlit server didn't start")
+
+
+# The app's own metrics endpoint, as {"name{labels}": value}; empty until a session
+# has run a page (the endpoint starts on first use)
+def scrape_metrics(port):
+    try:
+        text = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=10).read()
+    except OSError:
+        return {}
+    metrics = {}
+    for line in text.decode().splitlines():
+        match = METRIC_LINE.match(line)
+        if match:
+            metrics[match.group(1) + (match.group(2) or "")] = float(match.group(3))
+    return metrics
+
+
+# One browser tab: a websocket session that reruns pages the way the frontend does,
+# and keeps the widgets of the last run so the next step can interact with them
+class Session:
+    def __init__(self, port):
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.connection = None
+        self.pages = {}  # page name -> page script hash
+        self.page_hash = ""
+        self.widgets = []  # (element type, proto) of the last run
+
+    async def connect(self):
+        self.connection = await websocket_connect(self.url, subprotocols=["streamlit"])
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+    # Rerun with the given page and widget values; returns the seconds until the run
+    # finished (runs cut short by st.switch_page continue with the new page)
+    async def rerun(self, page_hash=None, widget_states=()):
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = self.page_hash if page_hash is None else page_hash
+        for widget_id, field, value in widget_states:
+            state = message.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            setattr(state, field, value)
+
+        start = time.perf_counter()
+        await self.connection.write_message(message.SerializeToString(), binary=True)
+        self.widgets = []
+        while True:
+            data = await asyncio.wait_for(self.connection.read_message(), RERUN_TIMEOUT)
+            if data is None:
+                raise ConnectionError("Server closed the session")
+            reply = ForwardMsg()
+            reply.ParseFromString(data)
+            kind = reply.WhichOneof("type")
+            if kind == "new_session":
+                self.pages = {page.page_name: page.page_script_hash
+                              for page in reply.new_session.app_pages}
+                self.page_hash = reply.new_session.page_script_hash
+                self.widgets = []
+            elif kind == "delta" and reply.delta.WhichOneof("type") == "new_element":
+                element = reply.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in WIDGET_VALUE:
+                    self.widgets.append((element_type, getattr(element, element_type)))
+            elif kind == "script_finished":
+                if reply.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                if reply.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("Page failed to compile")
+                return time.perf_counter() - start
+
+    def widget(self, element_type, label):
+        return next((proto for kind, proto in self.widgets
+                     if kind == element_type and proto.label.startswith(label)), None)
+
+    async def set_widget(self, element_type, label, value):
+        proto = self.widget(element_type, label)
+        if proto is None:
+            return None
+        return await self.rerun(widget_states=[(proto.id, WIDGET_VALUE[element_type], value)])
+
+    async def login(self):
+        await self.rerun(page_hash="")
+        username = self.widget("text_input", "Username")
+        password = self.widget("text_input", "Password")
+        submit = self.widget("button", "Log in")
+        return await self.rerun(widget_states=[
+            (username.id, "string_value", "admin"),
+            (password.id, "string_value", "admin"),
+            (submit.id, "trigger_value", True),
+        ])
+
+    async def visit(self, page):
+        return await self.rerun(page_hash=self.pages[page])
+
+
+def _other_option(proto, rng):
+    options = len(proto.options)
+    if options < 2:
+        return proto.default
+    return (proto.default + rng.randrange(1, options)) % options
+
+
+async def journal_grid_page(session, rng):
+    grid_page = session.widget("number_input", "Page (of")
+    if grid_page is None or grid_page.max <= 1:
+        return None
+    return await session.set_widget("number_input", "Page (of",
+                                    float(rng.randint(2, int(grid_page.max))))
+
+
+async def dashboard_panel(session, rng):
+    panels = session.widget("radio", "Section")
+    return await session.set_widget("radio", "Section", _other_option(panels, rng)) \
+        if panels is not None else None
+
+
+async def reporting_period(session, rng):
+    period = session.widget("selectbox", "Select Reporting Period")
+    return await session.set_widget("selectbox", "Select Reporting Period",
+                                    _other_option(period, rng)) if period is not None else None
+
+
+async def other_month(session, rng):
+    month = session.widget("selectbox", "Month")
+    return await session.set_widget("selectbox", "Month", _other_option(month, rng)) \
+        if month is not None else None
+
+
+INTERACTIONS = {
+    "Journal": [("journal.grid_page", journal_grid_page)],
+    "Dashboard": [("dashboard.panel", dashboard_panel)],
+    "Reporting": [("reporting.period", reporting_period), ("reporting.month", other_month)],
+    "Calendar": [("calendar.month", other_month)],
+}
+
+
+# Login, then `steps` page visits, each followed by a few interactions on the page.
+# Every rerun's latency is appended to samples as (action, seconds).
+async def run_session(port, steps, seed, samples):
+    rng = random.Random(seed)
+    session = Session(port)
+    try:
+        await session.connect()
+        samples.append(("login", await session.login()))
+        for step in range(steps):
+            page = rng.choices(list(PAGE_WEIGHTS), weights=list(PAGE_WEIGHTS.values()))[0]
+            samples.append((f"visit.{page}", await session.visit(page)))
+            for _ in range(rng.randint(0, MAX_INTERACTIONS)):
+                name, interact = rng.choice(INTERACTIONS[page])
+                seconds = await interact(session, rng)
+                if seconds is not None:
+                    samples.append((name, seconds))
+    finally:
+        session.close()
+
+
+def percentiles(seconds):
+    p50, p95, p99 = np.percentile(seconds, [50, 95, 99])
+    return {"p50": round(float(p50), 4), "p95": round(float(p95), 4), "p99": round(float(p99), 4)}
+
+
+async def run_level(sessions, steps, seed, port, metrics_port, pid):
+    rss_before = rss_mb(pid)
+    samples = []
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *[run_session(port, steps, seed * 10_000 + i, samples) for i in range(sessions)],
+        return_exceptions=True)
+    wall = time.perf_counter() - start
+    failures = [repr(result) for result in results if isinstance(result, BaseException)]
+    rss_after = rss_mb(pid)
+    metrics = scrape_metrics(metrics_port)
+
+    by_action = {}
+    for action, seconds in samples:
+        by_action.setdefault(action, []).append(seconds)
+    return {
+        "sessions": sessions,
+        "reruns": len(samples),
+        "failures": failures,
+        "wall_seconds": round(wall, 3),
+        "throughput": round(len(samples) / wall, 3) if wall else None,
+        "latency": percentiles([seconds for action, seconds in samples]) if samples else None,
+        "actions": {action: dict(percentiles(seconds), count=len(seconds))
+                    for action, seconds in sorted(by_action.items())},
+        "rss_before_mb": round(rss_before, 1),
+        "rss_after_mb": round(rss_after, 1),
+        "rss_per_session_mb": round((rss_after - rss_before) / sessions, 2),
+        "session_state_mb": round(metrics.get("journal_session_state_bytes", 0) / 2 ** 20, 1),
+        "session_rows": metrics.get('journal_trade_store_rows{store="sessions"}'),
+        "live_sessions": sum(value for name, value in metrics.items()
+                             if name.startswith("journal_sessions{")),
+    }
+
+
+def print_level(level):
+    latency = level["latency"] or {"p50": 0, "p95": 0, "p99": 0}
+    print(f"{level['sessions']:>8} {level['reruns']:>7} {level['throughput']:>8.2f} "
+          f"{latency['p50']:>8.3f} {latency['p95']:>8.3f} {latency['p99']:>8.3f} "
+          f"{level['rss_after_mb']:>9.0f} {level['rss_per_session_mb']:>9.2f} "
+          f"{level['session_state_mb']:>9.1f} {level['live_sessions']:>6.0f}", flush=True)
+    for failure in level["failures"]:
+        print(f"  failed: {failure}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of one server.")
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 4, 16],
+                        help="simultaneous sessions per level")
+    parser.add_argument("--steps", type=int, default=20, help="page visits per session")
+    parser.add_argument("--trades", default="10k", help="fixture size, e.g. 10k 100k")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--open", type=float, default=0.01, dest="open_positions",
+                        help="share of trades left open")
+    parser.add_argument("-o", "--output", help="results JSON path")
+    args = parser.parse_args(argv)
+
+    n = parse_size(args.trades)
+    tradelog_path = ensure_dataset(n, args.seed, args.open_positions)
+    port, metrics_port = free_port(), free_port()
+    levels = []
+    with tempfile.TemporaryDirectory(prefix="journal-load-") as workdir:
+        server = start_server(tradelog_path, workdir, port, metrics_port)
+        try:
+            print(f"server pid {server.pid}, {n:,} trades, RSS {rss_mb(server.pid):.0f} MB")
+            print(f"{'sessions':>8} {'reruns':>7} {'rerun/s':>8} {'p50 s':>8} {'p95 s':>8} "
+                  f"{'p99 s':>8} {'RSS MB':>9} {'MB/sess':>9} {'state MB':>9} {'live':>6}")
+            for sessions in args.sessions:
+                level = asyncio.run(run_level(sessions, args.steps, args.seed, port,
+                                              metrics_port, server.pid))
+                levels.append(level)
+                print_level(level)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "trades": n,
+        "steps": args.steps,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "levels": levels,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load-{datetime.datetime.now():%Y%m%d-%H%M%S}-{(commit or 'nocommit')[:8]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as results_file:
+        json.dump(report, results_file, indent=2)
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
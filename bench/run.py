@@ -0,0 +1,268 @@
+import argparse
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from bench.synthetic import generate_tradelog, write_tradelog, parse_size
+from calculations import recalculate_trades, trade_base, apply_fee_schedule, running_balance
+from downsample import downsample_indices
+from exports import write_csv, write_parquet
+from prewarm import PREWARM_ENV
+from filters import TradeIndex
+from search import NotesIndex
+from settings import DEFAULT_SETTINGS
+from tags import TagIndex
+from trade_store import normalize
+
+# Run from the project directory: python -m bench.run --sizes 10k 100k 2>/dev/null
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, "bench", "results")
+# Generated logs are kept between runs; they are the same for the same size and seed
+DATA_DIR = os.path.join(REPO_DIR, "bench", "data")
+
+DEFAULT_SIZES = ["10k", "100k"]
+# Seconds a single page run may take before AppTest gives up
+PAGE_TIMEOUT = 900
+
+DASHBOARD_PANELS = ["Performance", "Analytics", "Evaluation"]
+REPORTING_PERIODS = ["Quarterly", "Annual"]
+
+FILTER_CRITERIA = {
+    "date_range": (pd.Timestamp("2018-01-01"), pd.Timestamp("2020-12-31")),
+    "pnl_min": 0.0,
+    "Ticker": ["ES", "NQ", "MES"],
+    "Setup": ["Zone", "Sniper"],
+}
+TAG_QUERY = "news day AND (scaled in OR \"a+ setup\") AND NOT revenge"
+NOTES_QUERY = "breakout pullback held target"
+
+
+# Every benchmark is (name, setup, run): setup builds the inputs outside the
+# measurement, run is what gets timed. Caches shared between sessions are cleared
+# first, so every measurement starts cold unless its setup warms them on purpose.
+def clear_caches():
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    gc.collect()
+
+
+def measure(setup, run, memory=True):
+    clear_caches()
+    state = setup()
+    start = time.perf_counter()
+    run(state)
+    seconds = time.perf_counter() - start
+
+    peak_mb = None
+    if memory:
+        # A second pass under tracemalloc, so tracing doesn't slow the timed one
+        clear_caches()
+        state = setup()
+        tracemalloc.start()
+        try:
+            run(state)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return seconds, peak_mb
+
+
+def dataset_path(n, seed):
+    return os.path.join(DATA_DIR, f"tradelog_{n}_seed{seed}.csv")
+
+
+def ensure_dataset(n, seed, open_positions):
+    path = dataset_path(n, seed)
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        write_tradelog(generate_tradelog(n, seed, open_positions), path)
+    return path
+
+
+def load_tradelog(path):
+    return normalize(pd.read_csv(path))
+
+
+# Same steps as the Journal's Add Trade button, with the save written to memory
+def add_trade(tradelog):
+    new_trade = pd.DataFrame([{
+        "Trade ID": int(pd.to_numeric(tradelog["Trade ID"], errors="coerce").max()) + 1,
+        "Date": tradelog["Date"].iloc[-1], "Entry Time": "10:00 AM", "Exit Time": "10:30 AM",
+        "Ticker": "ES", "Direction": "Long", "Contracts": 1, "Entry Price": 20.0,
+        "Exit Price": 21.0, "Setup": "Zone", "Entry/Exit": "As Planned",
+        "Emotion": "By The Rules", "Tags": "", "Notes": "", "Net PnL": 46.6,
+    }])
+    last_balance = tradelog["Cumulative Performance"].iloc[-1]
+    new_trade["Cumulative Performance"] = running_balance(new_trade["Net PnL"], last_balance)
+    tradelog = pd.concat([tradelog, new_trade], ignore_index=True)
+    tradelog["20 MA"] = tradelog["Cumulative Performance"].rolling(window=20).mean()
+    tradelog.to_csv(io.StringIO(), index=False)
+    return normalize(tradelog)
+
+
+# Same steps as the Journal's CSV import
+def import_tradelog(raw):
+    tradelog = raw.copy()
+    tradelog.index += 1
+    tradelog.reset_index(inplace=True)
+    tradelog.rename(columns={"index": "Trade ID"}, inplace=True)
+    return recalculate_trades(tradelog, DEFAULT_SETTINGS["risk_management_fee"],
+                              DEFAULT_SETTINGS["ticker_data"], DEFAULT_SETTINGS["initial_balance"])
+
+
+def compute_benchmarks(path):
+    tradelog = load_tradelog(path)
+    raw = tradelog.drop(columns=["Trade ID"])
+    base = trade_base(tradelog, DEFAULT_SETTINGS["ticker_data"])
+    balance = tradelog["Cumulative Performance"].to_numpy()
+    edited = tradelog.copy()
+    edited.loc[edited.index[-1], "Notes"] = NOTES_QUERY
+
+    def given(value):
+        return lambda: value
+
+    return [
+        ("load.read_csv", given(path), load_tradelog),
+        ("journal.import", given(raw), import_tradelog),
+        ("journal.add_trade", given(tradelog), add_trade),
+        ("calc.trade_base", given(tradelog),
+         lambda df: trade_base(df, DEFAULT_SETTINGS["ticker_data"])),
+        ("calc.fee_schedule", given(base),
+         lambda b: apply_fee_schedule(b, 2.0, DEFAULT_SETTINGS["initial_balance"])),
+        ("filters.build_index", given(tradelog), TradeIndex),
+        ("filters.match", lambda: TradeIndex(tradelog),
+         lambda index: index.match(FILTER_CRITERIA)),
+        ("tags.build_index", given(tradelog), TagIndex),
+        ("tags.query", lambda: TagIndex(tradelog), lambda index: index.query(TAG_QUERY)),
+        ("search.build_index", given(tradelog), NotesIndex),
+        ("search.query", lambda: NotesIndex(tradelog),
+         lambda index: index.search(NOTES_QUERY)),
+        ("search.update_index", lambda: NotesIndex(tradelog), lambda index: index.updated(edited)),
+        ("downsample.equity_curve", given(balance), downsample_indices),
+        ("exports.csv", given(tradelog), lambda df: write_csv(df, io.BytesIO())),
+        ("exports.parquet", given(tradelog), lambda df: write_parquet(df, io.BytesIO())),
+    ]
+
+
+# A logged-in AppTest session holding the tradelog, on the given page but not yet run
+def open_page(tradelog, page):
+    app = AppTest.from_file(os.path.join(REPO_DIR, "Journal_app.py"),
+                            default_timeout=PAGE_TIMEOUT)
+    app.session_state["logged_in"] = True
+    app.session_state["tradelog"] = tradelog.copy()
+    app.switch_page(f"pages/{page}.py")
+    return app
+
+
+def run_page(app):
+    app.run()
+    if app.exception:
+        raise RuntimeError(f"Page failed: {app.exception[0].value}")
+    return app
+
+
+def loaded_page(tradelog, page):
+    return lambda: run_page(open_page(tradelog, page))
+
+
+def choose_panel(app, panel):
+    app.radio(key="dashboard_panel").set_value(panel)
+    return run_page(app)
+
+
+def select(app, label, value):
+    next(box for box in app.selectbox if box.label == label).set_value(value)
+    return run_page(app)
+
+
+# Each page run headless through AppTest: the first visit (cold caches), a rerun
+# with nothing changed, and the page's other panels or report periods
+def page_benchmarks(path):
+    tradelog = load_tradelog(path)
+    benchmarks = []
+    for page in ["Journal", "Calendar", "Dashboard", "Reporting"]:
+        benchmarks.append((f"page.{page}", lambda page=page: open_page(tradelog, page), run_page))
+        benchmarks.append((f"page.{page}.rerun", loaded_page(tradelog, page), run_page))
+    for panel in DASHBOARD_PANELS:
+        benchmarks.append((
+            f"page.Dashboard.{panel}", loaded_page(tradelog, "Dashboard"),
+            lambda app, panel=panel: choose_panel(app, panel)))
+    for period in REPORTING_PERIODS:
+        benchmarks.append((
+            f"page.Reporting.{period}", loaded_page(tradelog, "Reporting"),
+            lambda app, period=period: select(app, "Select Reporting Period", period)))
+    return benchmarks
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the app's compute paths on synthetic logs.")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES,
+                        help="trade counts, e.g. 10k 100k 1m 10m")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--open", type=float, default=0.01, dest="open_positions",
+                        help="share of trades left open")
+    parser.add_argument("--only", help="run benchmarks whose name starts with this")
+    parser.add_argument("--no-pages", action="store_true", help="skip the AppTest page runs")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("-o", "--output", help="results JSON path")
+    args = parser.parse_args(argv)
+    # Every measurement starts cold; the app's background warm-up would fill the caches
+    os.environ[PREWARM_ENV] = "0"
+
+    commit = git_commit()
+    results = []
+    for size in args.sizes:
+        n = parse_size(size)
+        path = ensure_dataset(n, args.seed, args.open_positions)
+        benchmarks = compute_benchmarks(path)
+        if not args.no_pages:
+            benchmarks += page_benchmarks(path)
+
+        for name, setup, run in benchmarks:
+            if args.only and not name.startswith(args.only):
+                continue
+            seconds, peak_mb = measure(setup, run, memory=not args.no_memory)
+            results.append({"name": name, "trades": n, "seconds": round(seconds, 6),
+                            "peak_mb": None if peak_mb is None else round(peak_mb, 3)})
+            memory = "" if peak_mb is None else f"  {peak_mb:10.1f} MB"
+            print(f"{name:<28} {n:>11,} {seconds:10.3f} s{memory}", flush=True)
+
+    report = {
+        "commit": commit,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "packages": {"pandas": pd.__version__, "numpy": np.__version__,
+                     "streamlit": st.__version__},
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{(commit or 'nocommit')[:8]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as results_file:
+        json.dump(report, results_file, indent=2)
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
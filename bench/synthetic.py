@@ -0,0 +1,154 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from calculations import recalculate_trades
+from settings import DEFAULT_SETTINGS
+
+# Named sizes for the command line and the benchmark suite
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# Same choices as the Journal's New Entry form
+TICKERS = ['ES', 'GC', 'CL', 'YM', 'NQ', 'MES', 'MCL', 'MGC', 'MYM', 'MNQ']
+DIRECTIONS = ['Long', 'Short']
+SETUPS = ['Zone', 'Crusher', 'Sniper', 'Tug Of War', 'TC', 'HY', 'IFN', 'REV', 'TF', 'DDV',
+          'Other']
+ENTRY_EXITS = ['As Planned', 'Too Early', 'Too Late', 'Not In Plan', 'Broke Rules',
+               'Stop to tight', 'First 30 min', 'Didn\'t Check News']
+EMOTIONS = ['By The Rules', 'Fear', 'Hope', 'Greed', 'FOMO', 'Bored', 'Tired', 'Distracted']
+
+TAGS = ['news day', 'scaled in', 'scaled out', 'a+ setup', 'revenge', 'overnight', 'fomc',
+        'trend day', 'range day', 'moved stop']
+NOTE_WORDS = ("entry late stop held target hit chased breakout pullback trend range news "
+              "patience size reduced added followed plan exit early vwap open close "
+              "momentum reversal support resistance").split()
+
+# First trading day; later trades fill business days from here, several per day on
+# the larger logs so the history spans about ten years at most
+START_DATE = "2015-01-02"
+MAX_TRADING_DAYS = 2500
+
+# Session hours the entry and exit times fall in, in minutes after midnight
+SESSION_OPEN = 9 * 60 + 30
+SESSION_CLOSE = 16 * 60
+
+
+def _clock(minutes):
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{(hours - 1) % 12 + 1}:{minutes:02d} {'AM' if hours < 12 else 'PM'}"
+
+
+# Every minute of the session as "9:54 AM" strings, indexed by minutes after the open
+CLOCK_TIMES = np.array([_clock(minute) for minute in range(SESSION_OPEN, SESSION_CLOSE + 1)],
+                       dtype=object)
+
+
+# Up to size distinct values made by build
+def _pool(rng, size, build):
+    return pd.unique(np.array([build(rng) for _ in range(size)], dtype=object))
+
+
+def _tags(rng):
+    return ", ".join(rng.choice(TAGS, size=rng.integers(1, 4), replace=False))
+
+
+def _note(rng):
+    return " ".join(rng.choice(NOTE_WORDS, size=rng.integers(4, 16))).capitalize() + "."
+
+
+# A tradelog of n trades with the columns the Journal saves (tradelog_updated.csv plus
+# Tags and Notes), the same for the same n and seed. Prices, sizes and moves follow the
+# bundled sample log; fees, PnL and the running balance come from recalculate_trades
+# with the default settings. Text columns are categorical to keep 10M rows in memory;
+# write the frame to CSV to get the plain strings the app reads back.
+def generate_tradelog(n, seed=0, open_positions=0.0):
+    rng = np.random.default_rng(seed)
+
+    trades_per_day = max(1, -(-n // MAX_TRADING_DAYS))
+    days = pd.bdate_range(START_DATE, periods=-(-n // trades_per_day))
+    dates = np.repeat(days.to_numpy(), trades_per_day)[:n]
+
+    entry_minute = rng.integers(0, SESSION_CLOSE - SESSION_OPEN - 5, size=n)
+    exit_minute = np.minimum(entry_minute + rng.integers(1, 90, size=n),
+                             SESSION_CLOSE - SESSION_OPEN)
+
+    entry_price = np.round(rng.uniform(1, 50, size=n), 2)
+    move = np.round(rng.gamma(1.3, 1.4, size=n), 2)
+    exit_price = np.round(np.maximum(entry_price + rng.choice([-1, 1], size=n) * move, 0.01), 2)
+
+    is_open = rng.random(n) < open_positions
+    exit_price[is_open] = np.nan
+
+    def categorical(codes, categories):
+        return pd.Categorical.from_codes(codes, categories=categories)
+
+    tag_pool = _pool(rng, 200, _tags)
+    note_pool = _pool(rng, 500, _note)
+    # Most trades carry no tags or notes; -1 codes become missing, written as empty
+    tag_codes = np.where(rng.random(n) < 0.4, rng.integers(0, len(tag_pool), size=n), -1)
+    note_codes = np.where(rng.random(n) < 0.3, rng.integers(0, len(note_pool), size=n), -1)
+
+    tradelog = pd.DataFrame({
+        "Trade ID": np.arange(1, n + 1),
+        "Date": dates,
+        "Entry Time": categorical(entry_minute, CLOCK_TIMES),
+        "Exit Time": categorical(np.where(is_open, -1, exit_minute), CLOCK_TIMES),
+        "Ticker": categorical(rng.integers(0, len(TICKERS), size=n), TICKERS),
+        "Direction": categorical(rng.integers(0, 2, size=n), DIRECTIONS),
+        "Contracts": rng.integers(1, 11, size=n),
+        "Entry Price": entry_price,
+        "Exit Price": exit_price,
+        "Setup": categorical(rng.integers(0, len(SETUPS), size=n), SETUPS),
+        "Entry/Exit": categorical(rng.integers(0, len(ENTRY_EXITS), size=n), ENTRY_EXITS),
+        "Emotion": categorical(rng.integers(0, len(EMOTIONS), size=n), EMOTIONS),
+    })
+    # trade_base compares the Direction values to "Long" and "Short"
+    tradelog["Direction"] = tradelog["Direction"].astype(object)
+
+    tradelog = recalculate_trades(tradelog, DEFAULT_SETTINGS["risk_management_fee"],
+                                  DEFAULT_SETTINGS["ticker_data"],
+                                  DEFAULT_SETTINGS["initial_balance"])
+    tradelog["Direction"] = tradelog["Direction"].astype("category")
+    tradelog["Tags"] = categorical(tag_codes, tag_pool)
+    tradelog["Notes"] = categorical(note_codes, note_pool)
+
+    columns = ["Trade ID", "Date", "Entry Time", "Exit Time", "Ticker", "Direction",
+               "Contracts", "Entry Price", "Exit Price", "Setup", "Entry/Exit", "Emotion",
+               "Risk Management Fee", "Total Broker Fees", "Return %", "PnL", "Net PnL",
+               "Cumulative Performance", "Performance %", "20 MA", "Tags", "Notes"]
+    return tradelog[columns]
+
+
+# Write the log as CSV in chunks, so 10M rows don't need a second copy as text
+def write_tradelog(tradelog, path, chunk_rows=500_000):
+    with open(path, "w", newline="") as output:
+        for start in range(0, len(tradelog), chunk_rows):
+            tradelog.iloc[start:start + chunk_rows].to_csv(
+                output, index=False, header=start == 0, date_format="%Y-%m-%d")
+
+
+def parse_size(text):
+    text = text.lower()
+    if text in SIZES:
+        return SIZES[text]
+    return int(text.replace("_", ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic trade log as CSV.")
+    parser.add_argument("size", help="number of trades, or one of " + ", ".join(SIZES))
+    parser.add_argument("-o", "--output", help="CSV path (default: tradelog_<size>.csv)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--open", type=float, default=0.0, dest="open_positions",
+                        help="share of trades left open, e.g. 0.01")
+    args = parser.parse_args(argv)
+
+    n = parse_size(args.size)
+    path = args.output or f"tradelog_{args.size.lower()}.csv"
+    write_tradelog(generate_tradelog(n, args.seed, args.open_positions), path)
+    print(f"Wrote {n:,} trades to {path}")
+
+
+if __name__ == "__main__":
+    main()
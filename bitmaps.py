@@ -0,0 +1,44 @@
+import numpy as np
+
+
+# Row bitmaps are boolean masks packed 8 rows to a byte, so combining predicates
+# is a bitwise AND/OR over n / 8 bytes
+def pack(mask):
+    return np.packbits(np.asarray(mask, dtype=bool))
+
+
+def all_rows(n):
+    return pack(np.ones(n, dtype=bool))
+
+
+def no_rows(n):
+    return pack(np.zeros(n, dtype=bool))
+
+
+def from_positions(positions, n):
+    mask = np.zeros(n, dtype=bool)
+    mask[positions] = True
+    return pack(mask)
+
+
+# Row positions set in a bitmap, in tradelog order
+def positions(bitmap, n):
+    return np.flatnonzero(np.unpackbits(bitmap, count=n))
+
+
+# Rows matching any of `values` in a {value: bitmap} mapping
+def any_of(bitmaps, values, n):
+    combined = no_rows(n)
+    for value in values:
+        if value in bitmaps:
+            combined |= bitmaps[value]
+    return combined
+
+
+# Rows not set in a bitmap; the padding bits of the last byte stay clear
+def invert(bitmap, n):
+    return all_rows(n) & ~bitmap
+
+
+def count(bitmap):
+    return int(np.unpackbits(bitmap).sum())
@@ -0,0 +1,221 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Used for tickers missing from the Settings ticker table
+DEFAULT_BROKER_FEE = 3
+DEFAULT_POINT_VALUE = 1
+DEFAULT_TICK_SIZE = 0.01
+
+# Columns the fees, PnL and running balance are derived from
+TRADE_INPUT_COLUMNS = ["Ticker", "Direction", "Contracts", "Entry Price", "Exit Price"]
+
+# Prices off their contract's tick grid are counted in tenths, hundredths, ... of a
+# tick, up to this many extra decimal places
+MAX_SUBTICK_DIGITS = 6
+
+
+# Money is held as int64 cents while computing, so sums and running balances are exact
+def to_cents(dollars):
+    return np.rint(np.asarray(dollars, dtype=float) * 100).astype(np.int64)
+
+
+def from_cents(cents):
+    return np.asarray(cents, dtype=np.int64) / 100
+
+
+# Running balance after each trade, summed in integer cents; missing PnL counts as 0
+def running_balance(net_pnl, starting_balance):
+    net_cents = to_cents(np.nan_to_num(np.asarray(net_pnl, dtype=float)))
+    return from_cents(to_cents(starting_balance) + np.cumsum(net_cents))
+
+
+# Per-ticker lookups from the ticker table, aligned to the tradelog rows
+def _ticker_lookup(tradelog, ticker_data, column, default):
+    ticker_data = pd.DataFrame(ticker_data)
+    if ticker_data.empty or column not in ticker_data.columns:
+        return np.full(len(tradelog), float(default))
+    values = dict(zip(ticker_data["Ticker"], ticker_data[column]))
+    return tradelog["Ticker"].map(values).fillna(default).to_numpy(dtype=float)
+
+
+# Trades without an exit price are open positions. Manual trades saved before open
+# positions existed have no Exit Time but are closed, so the exit time doesn't count.
+def open_trades(tradelog):
+    if "Exit Price" not in tradelog.columns:
+        return np.zeros(len(tradelog), dtype=bool)
+    return pd.to_numeric(tradelog["Exit Price"], errors="coerce").isna().to_numpy()
+
+
+# Size of the int64 price unit per trade: the contract's tick size, divided by 10 until
+# both entry and exit price are whole multiples of it
+def price_unit(tick_size, entry, exit_):
+    unit = tick_size.copy()
+    for _ in range(MAX_SUBTICK_DIGITS):
+        with np.errstate(invalid="ignore"):
+            off_grid = (np.abs(entry / unit - np.rint(entry / unit)) > 1e-6) | \
+                       (np.abs(exit_ / unit - np.rint(exit_ / unit)) > 1e-6)
+        if not off_grid.any():
+            break
+        unit[off_grid] /= 10
+    return unit
+
+
+# Everything about the trades that doesn't depend on the fee schedule or balance.
+# Prices become int64 ticks of each contract's tick size, so the points won or lost
+# are exact; gross PnL is int64 cents (ticks x contracts x tick value).
+def trade_base(tradelog, ticker_data):
+    tick_size = _ticker_lookup(tradelog, ticker_data, "Tick Size", DEFAULT_TICK_SIZE)
+    point_value = _ticker_lookup(tradelog, ticker_data, "Point Dollar Value", DEFAULT_POINT_VALUE)
+    entry = pd.to_numeric(tradelog["Entry Price"], errors="coerce").to_numpy(dtype=float)
+    exit_ = pd.to_numeric(tradelog["Exit Price"], errors="coerce").to_numpy(dtype=float)
+    contracts = pd.to_numeric(tradelog["Contracts"], errors="coerce").fillna(0) \
+        .to_numpy(dtype=np.int64)
+
+    # Open trades realize nothing yet
+    closed = ~open_trades(tradelog) & ~np.isnan(entry)
+    tick_size = price_unit(tick_size, np.nan_to_num(entry), np.nan_to_num(exit_))
+    entry_ticks = np.rint(np.nan_to_num(entry) / tick_size).astype(np.int64)
+    exit_ticks = np.rint(np.nan_to_num(exit_) / tick_size).astype(np.int64)
+
+    direction = tradelog["Direction"].to_numpy()
+    sign = np.where(direction == "Long", 1, np.where(direction == "Short", -1, 0))
+    points_ticks = np.where(closed, sign * (exit_ticks - entry_ticks), 0)
+
+    tick_value_cents = point_value * tick_size * 100
+    pnl_cents = np.rint(contracts * points_ticks * tick_value_cents).astype(np.int64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return_pct = np.where(closed, np.round(points_ticks / entry_ticks * 100, 2), np.nan)
+
+    return {
+        "closed": closed,
+        "contracts": contracts,
+        "entry_ticks": entry_ticks,
+        "tick_size": tick_size,
+        "pnl_cents": pnl_cents,
+        "broker_fee": _ticker_lookup(tradelog, ticker_data, "Broker Fees", DEFAULT_BROKER_FEE),
+        "return_pct": return_pct,
+    }
+
+
+# Base arrays for a tradelog version and ticker table, shared between sessions
+# (the underscores keep the frame and table unhashed; the versions identify them)
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_trade_base(_tradelog, version, _ticker_data, settings_key):
+    return trade_base(_tradelog, _ticker_data)
+
+
+# Fees, Net PnL and the running balance for one fee schedule in int64 cents.
+# broker_fee overrides the per-ticker fees when given. The risk management fee is a
+# rate on the entry notional and is rounded to the cent once per trade.
+def fee_schedule_cents(base, risk_management_fee, initial_balance, broker_fee=None):
+    broker_fee = base["broker_fee"] if broker_fee is None else np.full_like(
+        base["broker_fee"], broker_fee)
+    notional_cents = base["entry_ticks"] * base["tick_size"] * base["contracts"] * 100
+    closed = base["closed"]
+
+    risk_fee = np.where(closed, np.rint(risk_management_fee / 100 * notional_cents), 0) \
+        .astype(np.int64)
+    broker_fees = np.where(closed, to_cents(broker_fee) * base["contracts"], 0)
+    net_pnl = base["pnl_cents"] - risk_fee - broker_fees
+
+    cumulative = to_cents(initial_balance) + np.cumsum(net_pnl)
+    return {"risk_fee": risk_fee, "broker_fees": broker_fees, "net_pnl": net_pnl,
+            "cumulative": cumulative}
+
+
+# The same schedule as the tradelog's dollar columns; open trades show no fees or PnL
+def apply_fee_schedule(base, risk_management_fee, initial_balance, broker_fee=None):
+    cents = fee_schedule_cents(base, risk_management_fee, initial_balance, broker_fee)
+    closed = base["closed"]
+
+    cumulative = from_cents(cents["cumulative"])
+    previous = np.concatenate(([float(initial_balance)], cumulative[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        performance = (cumulative / previous - 1) * 100
+
+    return {
+        "Risk Management Fee": np.where(closed, from_cents(cents["risk_fee"]), np.nan),
+        "Total Broker Fees": np.where(closed, from_cents(cents["broker_fees"]), np.nan),
+        "PnL": np.where(closed, from_cents(base["pnl_cents"]), np.nan),
+        "Net PnL": np.where(closed, from_cents(cents["net_pnl"]), np.nan),
+        "Cumulative Performance": cumulative,
+        "Performance %": performance,
+    }
+
+
+# The tradelog with every derived column recomputed from the given settings
+def recalculate_trades(tradelog, risk_management_fee, ticker_data, initial_balance):
+    base = trade_base(tradelog, ticker_data)
+    columns = apply_fee_schedule(base, risk_management_fee, initial_balance)
+    columns["Return %"] = base["return_pct"]
+    tradelog = tradelog.assign(**columns)
+    tradelog["20 MA"] = tradelog["Cumulative Performance"].rolling(window=20).mean()
+    return tradelog
+
+
+# The tradelog after edits to the trade inputs of the rows at `positions`: those rows'
+# fees, PnL and return are recomputed from the settings, and the running balance from
+# the first of them on. Earlier trades and the other rows' fees keep their values.
+def recalculate_rows(tradelog, positions, risk_management_fee, ticker_data, initial_balance):
+    tradelog = tradelog.copy()
+    positions = np.sort(np.asarray(positions, dtype=np.int64))
+    if len(positions) == 0:
+        return tradelog
+
+    rows = tradelog.iloc[positions]
+    base = trade_base(rows, ticker_data)
+    columns = apply_fee_schedule(base, risk_management_fee, 0)
+    columns["Return %"] = base["return_pct"]
+    for column in ["Risk Management Fee", "Total Broker Fees", "PnL", "Net PnL", "Return %"]:
+        if column not in tradelog.columns:
+            tradelog[column] = np.nan
+        tradelog.iloc[positions, tradelog.columns.get_loc(column)] = columns[column]
+
+    first = positions[0]
+    cumulative = pd.to_numeric(tradelog["Cumulative Performance"], errors="coerce") \
+        .to_numpy(dtype=float) if "Cumulative Performance" in tradelog.columns \
+        else np.full(len(tradelog), np.nan)
+    start = cumulative[first - 1] if first > 0 and not np.isnan(cumulative[first - 1]) \
+        else float(initial_balance)
+    cumulative[first:] = running_balance(tradelog["Net PnL"].iloc[first:], start)
+    previous = np.concatenate(([float(initial_balance)], cumulative[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tradelog["Performance %"] = (cumulative / previous - 1) * 100
+    tradelog["Cumulative Performance"] = cumulative
+    tradelog["20 MA"] = tradelog["Cumulative Performance"].rolling(window=20).mean()
+    return tradelog
+
+
+# Largest fall of a running balance from its previous high
+def max_drawdown(balance):
+    if len(balance) == 0:
+        return 0
+    return (np.maximum.accumulate(balance) - balance).max()
+
+
+# Side-by-side results of several fee schedules over the whole history. Each scenario
+# is a dict with Scenario, Risk Management Fee (%), Broker Fee per Contract (None
+# keeps the ticker table's fees) and Initial Balance. Totals are summed in cents.
+# Returns a summary table and the running balance (dollars) of each scenario.
+def compare_scenarios(base, scenarios):
+    rows = []
+    balances = {}
+    for scenario in scenarios:
+        cents = fee_schedule_cents(base, scenario["Risk Management Fee (%)"],
+                                   scenario["Initial Balance"],
+                                   scenario.get("Broker Fee per Contract"))
+        balance = cents["cumulative"]
+        start = to_cents(scenario["Initial Balance"])
+        final = balance[-1] if len(balance) else start
+        rows.append({
+            "Scenario": scenario["Scenario"],
+            "Total Fees": from_cents(cents["risk_fee"].sum() + cents["broker_fees"].sum()),
+            "Net PnL": from_cents(cents["net_pnl"].sum()),
+            "Final Balance": from_cents(final),
+            "Return %": (final / start - 1) * 100 if start else np.nan,
+            "Max Drawdown": from_cents(max_drawdown(balance)),
+        })
+        balances[scenario["Scenario"]] = from_cents(balance)
+    return pd.DataFrame(rows), balances
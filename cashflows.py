@@ -0,0 +1,160 @@
+import csv
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from settings import get_settings
+from calculations import to_cents, from_cents, running_balance
+from metrics import LOADER_REQUESTS, LOADER_MISSES
+
+# Deposits and withdrawals ledger in the project directory. Rows are only ever appended.
+CASHFLOWS_PATH = os.path.join(os.getcwd(), "withdrawals.csv")
+
+LEDGER_COLUMNS = ["Date", "Amount", "Currency", "Type"]
+FLOW_TYPES = ["Withdrawal", "Deposit"]
+
+_ledger_lock = threading.Lock()
+
+
+# Changes whenever the ledger file is written; keys the cached ledger and results
+def ledger_version(path=CASHFLOWS_PATH):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+# The ledger sorted by date, with a signed Flow column (deposits in, withdrawals out).
+# Ledgers written before deposits existed have no Type column and hold only withdrawals.
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_ledger(version, path=CASHFLOWS_PATH):
+    LOADER_MISSES.inc(loader="ledger")
+    if version is None:
+        ledger = pd.DataFrame(columns=LEDGER_COLUMNS)
+    else:
+        ledger = pd.read_csv(path)
+    if "Type" not in ledger.columns:
+        ledger["Type"] = "Withdrawal"
+    ledger["Date"] = pd.to_datetime(ledger["Date"], errors="coerce")
+    ledger["Amount"] = pd.to_numeric(ledger["Amount"], errors="coerce").fillna(0.0)
+    ledger["Flow"] = np.where(ledger["Type"] == "Deposit", ledger["Amount"], -ledger["Amount"])
+    return ledger.dropna(subset=["Date"]).sort_values("Date", kind="stable").reset_index(drop=True)
+
+
+def get_ledger():
+    LOADER_REQUESTS.inc(loader="ledger")
+    return load_ledger(ledger_version())
+
+
+# Append one deposit or withdrawal. Only the new line is written; a ledger from before
+# deposits existed gets its Type column added once first.
+def append_cashflow(date, amount, currency, flow_type, path=CASHFLOWS_PATH):
+    with _ledger_lock:
+        if os.path.exists(path):
+            with open(path, newline="") as ledger:
+                header = next(csv.reader(ledger), [])
+            if header and "Type" not in header:
+                upgraded = pd.read_csv(path)
+                upgraded["Type"] = "Withdrawal"
+                upgraded.to_csv(path, index=False)
+            write_header = not header
+            # A file saved without a final newline would merge the new row into the last one
+            missing_newline = False
+            with open(path, "rb") as ledger:
+                if ledger.seek(0, os.SEEK_END) > 0:
+                    ledger.seek(-1, os.SEEK_END)
+                    missing_newline = ledger.read(1) != b"\n"
+        else:
+            write_header = True
+            missing_newline = False
+
+        with open(path, "a", newline="") as ledger:
+            if missing_newline:
+                ledger.write("\n")
+            writer = csv.writer(ledger)
+            if write_header:
+                writer.writerow(LEDGER_COLUMNS)
+            writer.writerow([pd.Timestamp(date).strftime("%Y-%m-%d"), amount, currency, flow_type])
+
+
+# Largest fall of a growth index from its previous high, in percent (0 or negative)
+def max_drawdown_pct(growth):
+    growth = np.asarray(growth, dtype=float)
+    if len(growth) == 0:
+        return 0.0
+    return float((growth / np.maximum.accumulate(growth) - 1).min() * 100)
+
+
+# Account balance after each trade including deposits and withdrawals, and the
+# time-weighted return that leaves those cash flows out. One vectorized pass:
+# cumulative flows are attached to each trade with an as-of join on the date.
+# Performance % is each trade's return on the balance it started from and Drawdown %
+# the fall of the TWR from its high, so a withdrawal is neither a loss nor a drawdown.
+def cash_flow_adjusted_equity(tradelog, ledger):
+    net_pnl = pd.to_numeric(tradelog["Net PnL"], errors="coerce").fillna(0.0).to_numpy()
+    trades = pd.DataFrame({
+        "Date": pd.to_datetime(tradelog["Date"], errors="coerce").to_numpy(),
+        "Net PnL": net_pnl,
+        "Position": np.arange(len(tradelog)),
+    }).dropna(subset=["Date"]).sort_values(["Date", "Position"], kind="stable")
+
+    # Balance before the first trade, as recorded in the log
+    if "Cumulative Performance" in tradelog.columns and len(tradelog):
+        starting_balance = float(tradelog["Cumulative Performance"].iloc[0]) - net_pnl[0]
+    else:
+        starting_balance = float(get_settings()["initial_balance"])
+
+    # Flows dated on or before a trade's date count toward that trade's balance
+    flows = ledger.groupby("Date", as_index=False)["Flow"].sum()
+    flows["Cumulative Flow"] = flows["Flow"].cumsum()
+    trades = pd.merge_asof(trades, flows[["Date", "Cumulative Flow"]], on="Date",
+                           direction="backward")
+    trades["Cumulative Flow"] = trades["Cumulative Flow"].fillna(0.0)
+
+    # Balances are summed in integer cents so long histories don't drift
+    trades["Balance"] = from_cents(to_cents(running_balance(trades["Net PnL"], starting_balance)) +
+                                   to_cents(trades["Cumulative Flow"]))
+
+    # Each trade's return on the balance it started from, after any flows before it
+    balance_before = trades["Balance"] - trades["Net PnL"]
+    period_return = np.where(balance_before > 0, trades["Net PnL"] / balance_before, 0.0)
+    trades["Performance %"] = period_return * 100
+    growth = np.cumprod(1 + period_return)
+    trades["TWR"] = growth - 1
+    trades["Drawdown %"] = (growth / np.maximum.accumulate(growth) - 1) * 100
+    trades["20 MA"] = trades["Balance"].rolling(window=20).mean()
+
+    return trades.drop(columns="Position").reset_index(drop=True)
+
+
+# The flow-adjusted equity of a tradelog version, cached per tradelog, ledger and
+# settings version (the initial balance is used when the log has no running balance)
+@st.cache_resource(max_entries=16, show_spinner=False)
+def get_adjusted_equity(_tradelog, version, ledger_key, settings_key):
+    return cash_flow_adjusted_equity(_tradelog, load_ledger(ledger_key))
+
+
+# Summary of the cash flows and the adjusted equity, cached like the equity itself
+@st.cache_resource(max_entries=16, show_spinner=False)
+def calculate_cash_flow_summary(_tradelog, version, ledger_key, settings_key):
+    ledger = load_ledger(ledger_key)
+    equity = get_adjusted_equity(_tradelog, version, ledger_key, settings_key)
+    if len(equity):
+        # Flows dated after the last trade still change the balance
+        balance = equity["Balance"].iloc[-1] + ledger["Flow"].sum() - \
+            equity["Cumulative Flow"].iloc[-1]
+        twr = equity["TWR"].iloc[-1] * 100
+        drawdown = equity["Drawdown %"].min()
+    else:
+        balance = twr = drawdown = np.nan
+    return {
+        "deposits": ledger.loc[ledger["Flow"] > 0, "Flow"].sum(),
+        "withdrawals": -ledger.loc[ledger["Flow"] < 0, "Flow"].sum(),
+        "balance": balance,
+        "twr": twr,
+        "max_drawdown": drawdown,
+    }
@@ -0,0 +1,72 @@
+import numpy as np
+
+# Maximum number of points drawn per line trace; a wide chart is ~2000 px across,
+# so more points than this cannot be told apart on screen
+DEFAULT_POINT_BUDGET = 4000
+
+# Traces with more points than this are drawn with WebGL (scattergl) instead of SVG
+WEBGL_THRESHOLD = 1000
+
+
+# Largest-Triangle-Three-Buckets: pick `threshold` indices of (x, y) that keep the
+# visual shape of the series. The first and last points are always kept.
+def lttb_indices(x, y, threshold):
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average point of the next bucket (the last point for the final bucket)
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = np.nanmean(y[next_start:next_end]) if next_end > next_start else y[-1]
+
+        # Keep the point forming the largest triangle with the previous pick and that average
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) -
+                       (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.nanargmax(areas)) if np.isfinite(areas).any() else start
+        selected[i + 1] = a
+
+    return selected
+
+
+# Indices of the points that define the drawdown picture: the overall high and low,
+# and the peak and trough of the deepest drawdown
+def extreme_indices(y):
+    y = np.asarray(y, dtype=float)
+    if len(y) == 0 or not np.isfinite(y).any():
+        return np.array([], dtype=np.int64)
+
+    filled = np.where(np.isfinite(y), y, -np.inf)
+    running_max = np.maximum.accumulate(filled)
+    drawdown = np.where(np.isfinite(y), y - running_max, 0)
+    trough = int(np.argmin(drawdown))
+    peak = int(np.argmax(filled[:trough + 1]))
+
+    return np.unique([int(np.nanargmax(y)), int(np.nanargmin(y)), peak, trough])
+
+
+# Positions to plot for a series of `y` values so that at most about `budget` points
+# are drawn, keeping the drawdown extremes visible
+def downsample_indices(y, budget=DEFAULT_POINT_BUDGET):
+    n = len(y)
+    if n <= budget:
+        return np.arange(n)
+
+    # Trades are evenly spaced in sequence, so the position is used as x
+    sampled = lttb_indices(np.arange(n), y, budget)
+    return np.union1d(sampled, extreme_indices(y))
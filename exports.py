@@ -0,0 +1,104 @@
+import importlib.util
+from io import BytesIO
+
+import streamlit as st
+
+# Rows encoded per chunk; bounds the temporary text/Arrow data held at any one time
+CHUNK_ROWS = 20000
+
+# Encoded files kept for repeat downloads, and for how long (seconds)
+EXPORT_CACHE_ENTRIES = 4
+EXPORT_CACHE_TTL = 300
+
+# Download formats: file extension and MIME type
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+# Excel needs openpyxl or XlsxWriter; the format is only offered when one is installed
+def excel_engine():
+    for engine in ("xlsxwriter", "openpyxl"):
+        if importlib.util.find_spec(engine) is not None:
+            return engine
+    return None
+
+
+def available_formats():
+    return [name for name in EXPORT_FORMATS if name != "Excel" or excel_engine() is not None]
+
+
+def iter_chunks(df, chunk_rows=CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+# CSV encoded a chunk at a time, so the whole file never exists as one Python string
+def iter_csv_bytes(df, chunk_rows=CHUNK_ROWS):
+    if df.empty:
+        yield df.to_csv(index=False).encode()
+        return
+    for i, chunk in enumerate(iter_chunks(df, chunk_rows)):
+        yield chunk.to_csv(index=False, header=(i == 0)).encode()
+
+
+def write_csv(df, out):
+    for data in iter_csv_bytes(df):
+        out.write(data)
+
+
+# Parquet written one row group per chunk
+def write_parquet(df, out):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(out, schema) as writer:
+        for chunk in iter_chunks(df):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def write_excel(df, out):
+    import pandas as pd
+
+    with pd.ExcelWriter(out, engine=excel_engine()) as writer:
+        df.head(0).to_excel(writer, index=False, sheet_name="Trades")
+        for i, chunk in enumerate(iter_chunks(df)):
+            chunk.to_excel(writer, index=False, header=False, sheet_name="Trades",
+                           startrow=1 + i * CHUNK_ROWS)
+
+
+WRITERS = {"CSV": write_csv, "Parquet": write_parquet, "Excel": write_excel}
+
+
+# File contents of `df` in the given format, encoded straight into the buffer the
+# download button reads. Cached per (data version, selection, format) so reruns don't
+# re-encode; only a few recent files are kept, and only for a few minutes, so large
+# exports don't stay pinned in the process. Each caller gets its own buffer, so
+# sessions never share a read position. The underscore keeps the frame unhashed.
+@st.cache_data(ttl=EXPORT_CACHE_TTL, max_entries=EXPORT_CACHE_ENTRIES,
+               show_spinner="Preparing download...")
+def export_buffer(_df, version, selection, file_format):
+    out = BytesIO()
+    WRITERS[file_format](_df, out)
+    out.seek(0)
+    return out
+
+
+# Format picker and download button for a table of trades. The file is only built
+# once a format is chosen, and it is sent to this user's browser instead of written to disk.
+def render_download(df, version, selection, file_name, key):
+    col1, col2 = st.columns([1, 2], vertical_alignment="bottom")
+    with col1:
+        file_format = st.selectbox("Export format", options=[None] + available_formats(),
+                                   format_func=lambda name: "Choose..." if name is None else name,
+                                   key=f"{key}_format")
+    with col2:
+        if file_format is None:
+            st.button("Download", disabled=True, key=f"{key}_disabled")
+            return
+        extension, mime = EXPORT_FORMATS[file_format]
+        st.download_button("Download", data=export_buffer(df, version, selection, file_format),
+                           file_name=f"{file_name}.{extension}", mime=mime, key=f"{key}_download")
@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from timing import timed
+from metrics import LOADER_REQUESTS, LOADER_MISSES
+
+# Maximum number of figures kept in memory across all sessions
+MAX_CACHED_FIGURES = 128
+
+
+# Bounded, thread-safe LRU of built Plotly figures keyed by
+# (figure id, data version, view parameters)
+class FigureCache:
+    def __init__(self, max_entries=MAX_CACHED_FIGURES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            fig = self._figures.get(key)
+            if fig is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                LOADER_REQUESTS.inc(loader="figures")
+                return fig
+            self.misses += 1
+        LOADER_REQUESTS.inc(loader="figures")
+        LOADER_MISSES.inc(loader="figures")
+
+        # Build outside the lock so a slow figure doesn't block other sessions
+        fig = build()
+
+        with self._lock:
+            self._figures[key] = fig
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+    def __len__(self):
+        return len(self._figures)
+
+
+# One cache per server process, shared by every session
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+
+# Return the figure cached under (fig_id, version, params), calling `build` on a miss.
+# Cached figures are shared between sessions, so callers must not modify them.
+def cached_figure(fig_id, version, params, build):
+    def timed_build():
+        with timed(f"Build {fig_id}"):
+            return build()
+    return get_figure_cache().get_or_build((fig_id, version, params), timed_build)
+
+
+# st.plotly_chart, timed: turning a figure into JSON for the browser can cost more
+# than building it
+def plotly_chart(fig, **kwargs):
+    with timed("Serialize chart"):
+        return st.plotly_chart(fig, **kwargs)
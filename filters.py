@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from bitmaps import pack, all_rows, from_positions, positions, any_of
+from tags import get_tag_index
+from calculations import open_trades
+
+# Columns indexed as categories; each value gets a bitmap of the rows holding it
+CATEGORY_COLUMNS = ["Ticker", "Setup", "Direction", "Emotion"]
+
+# Trades without an exit price are still open
+ORDER_STATES = ["Open", "Closed"]
+
+
+# Sorted views and category bitmaps over one tradelog version
+class TradeIndex:
+    def __init__(self, tradelog):
+        self.n = len(tradelog)
+
+        # Dates and Net PnL sorted once, so ranges resolve with a binary search.
+        # NaT and NaN sort to the end and never fall inside a range.
+        dates = pd.to_datetime(tradelog["Date"], errors="coerce").to_numpy("datetime64[ns]")
+        self.date_order = np.argsort(dates, kind="stable")
+        self.sorted_dates = dates[self.date_order]
+
+        pnl = pd.to_numeric(tradelog["Net PnL"], errors="coerce").to_numpy(dtype=float)
+        self.pnl_order = np.argsort(pnl, kind="stable")
+        self.sorted_pnl = pnl[self.pnl_order]
+
+        self.trade_ids = tradelog["Trade ID"].to_numpy()
+
+        # One bitmap per value of each category column
+        self.categories = {}
+        for column in CATEGORY_COLUMNS:
+            if column not in tradelog.columns:
+                self.categories[column] = {}
+                continue
+            values = tradelog[column]
+            if column == "Ticker":
+                values = values.astype("string").str.strip().str.upper()
+            codes, uniques = pd.factorize(values)
+            self.categories[column] = {
+                value: pack(codes == code) for code, value in enumerate(uniques)}
+
+        closed = ~open_trades(tradelog)
+        self.categories["Order State"] = {"Closed": pack(closed), "Open": pack(~closed)}
+
+    def options(self, column):
+        return sorted(self.categories.get(column, {}), key=str)
+
+    # Rows dated within [start, end], both dates inclusive
+    def date_range(self, start, end):
+        lo = np.searchsorted(self.sorted_dates, np.datetime64(pd.Timestamp(start), "ns"),
+                             side="left")
+        hi = np.searchsorted(self.sorted_dates,
+                             np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1), "ns"),
+                             side="left")
+        return from_positions(self.date_order[lo:hi], self.n)
+
+    # Rows with Net PnL within [low, high]; either bound may be None
+    def pnl_range(self, low, high):
+        lo = 0 if low is None else np.searchsorted(self.sorted_pnl, low, side="left")
+        hi = np.searchsorted(self.sorted_pnl, np.inf, side="right") if high is None \
+            else np.searchsorted(self.sorted_pnl, high, side="right")
+        return from_positions(self.pnl_order[lo:hi], self.n)
+
+    def trade_id(self, trade_id):
+        return pack(self.trade_ids == trade_id)
+
+    # Bitmap of the rows matching every criterion that is set
+    def match(self, criteria):
+        result = all_rows(self.n)
+
+        if criteria.get("date_range"):
+            result &= self.date_range(*criteria["date_range"])
+        if criteria.get("pnl_min") is not None or criteria.get("pnl_max") is not None:
+            result &= self.pnl_range(criteria.get("pnl_min"), criteria.get("pnl_max"))
+        if criteria.get("trade_id") is not None:
+            result &= self.trade_id(criteria["trade_id"])
+        for column in CATEGORY_COLUMNS + ["Order State"]:
+            values = criteria.get(column)
+            if values:
+                if column == "Ticker":
+                    values = [value.strip().upper() for value in values]
+                result &= any_of(self.categories[column], values, self.n)
+
+        return result
+
+
+# Index for a tradelog version, built once and shared between sessions
+# (the underscore keeps the frame unhashed)
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_trade_index(_tradelog, version):
+    return TradeIndex(_tradelog)
+
+
+# Trades matching `criteria`. Only the matching rows are copied out of the tradelog.
+#   date_range: (start, end) dates, inclusive
+#   pnl_min / pnl_max: Net PnL bounds, inclusive
+#   trade_id: a single Trade ID
+#   Ticker / Setup / Direction / Emotion / Order State: lists of accepted values
+#   tags: a tag query, see TagIndex.query (raises ValueError if it can't be read)
+def filter_trades(tradelog, version, criteria):
+    index = get_trade_index(tradelog, version)
+    bitmap = index.match(criteria)
+    if criteria.get("tags"):
+        bitmap &= get_tag_index(tradelog, version).query(criteria["tags"])
+    return tradelog.take(positions(bitmap, index.n))
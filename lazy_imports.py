@@ -0,0 +1,55 @@
+import importlib
+import sys
+import threading
+import time
+import types
+
+# Seconds each lazily imported module took to import on first use, by module name;
+# close to 0 for a module something else had imported already
+IMPORT_SECONDS = {}
+
+_modules = {}
+_lock = threading.Lock()
+
+
+# Stands in for a module until an attribute is first read, then imports it:
+#   px = lazy_import("plotly.express")
+#   px.bar(...)  # plotly.express is imported here
+# Pages are re-run on every interaction, so the same stand-in is returned each time.
+class LazyModule(types.ModuleType):
+    def __init__(self, name):
+        super().__init__(name)
+        self._module = None
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with _lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    self._module = importlib.import_module(self.__name__)
+                    IMPORT_SECONDS[self.__name__] = time.perf_counter() - start
+                module = self._module
+        return module
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    with _lock:
+        module = _modules.get(name)
+        if module is None:
+            module = _modules[name] = sys.modules.get(name) or LazyModule(name)
+    return module
+
+
+# Import the module now, e.g. from a background thread before anyone needs it
+def preload(name):
+    module = lazy_import(name)
+    if isinstance(module, LazyModule):
+        module._load()
+    return module
@@ -0,0 +1,289 @@
+import functools
+import os
+import shutil
+import sys
+import threading
+import time
+import types
+import weakref
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from trade_store import SPILL_DIR, release_tradelog, discard_spill
+from metrics import REGISTRY, STORE_ROWS
+
+# Sessions with no script or fragment run for this long have their cached data
+# dropped; it is reloaded on next access. Set JOURNAL_IDLE_EVICT_SECONDS to change it,
+# 0 to disable.
+IDLE_EVICT_ENV = "JOURNAL_IDLE_EVICT_SECONDS"
+IDLE_EVICT_SECONDS = float(os.environ.get(IDLE_EVICT_ENV, 15 * 60))
+# Seconds between sweeps marking idle sessions, and between each session's check
+# for the mark
+SWEEP_SECONDS = 60
+
+# Session state key: while the session's tradelog is released, the page to resume
+RELEASED_KEY = "idle_released_page"
+
+# Not counted as session data: shared by everything that refers to them
+_SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType,
+                  types.BuiltinFunctionType, weakref.ref)
+
+SESSIONS = REGISTRY.gauge("journal_sessions", "Live sessions, by whether they are idle.",
+                          ["state"])
+SESSION_BYTES = REGISTRY.gauge("journal_session_state_bytes",
+                               "Deep size of the session state of all live sessions.")
+EVICTIONS = REGISTRY.counter("journal_session_evictions_total",
+                             "Idle sessions whose cached data was evicted.")
+
+
+# Bytes held by an object and everything it refers to. Frames, series and arrays are
+# measured by pandas/numpy including their string contents; anything reached twice
+# is counted once.
+def deep_size(obj, seen=None):
+    seen = set() if seen is None else seen
+    size = 0
+    pending = [obj]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, _SKIPPED_TYPES):
+            continue
+        seen.add(id(obj))
+
+        if isinstance(obj, pd.DataFrame):
+            size += int(obj.memory_usage(index=True, deep=True).sum())
+        elif isinstance(obj, (pd.Series, pd.Index)):
+            size += int(obj.memory_usage(deep=True))
+        elif isinstance(obj, np.ndarray):
+            size += obj.nbytes
+        else:
+            size += sys.getsizeof(obj)
+            if isinstance(obj, dict):
+                pending.extend(obj.keys())
+                pending.extend(obj.values())
+            elif isinstance(obj, (list, tuple, set, frozenset)):
+                pending.extend(obj)
+            elif hasattr(obj, "__dict__"):
+                pending.append(obj.__dict__)
+    return size
+
+
+class _Session:
+    def __init__(self, state):
+        self.state = weakref.ref(state)
+        self.last_seen = time.monotonic()
+        self.evictable = False
+
+
+# Every live session's state, by session id, with when it last ran. States are held
+# weakly: a session that ends drops out on the next sweep. The registry only reads
+# the states; sessions that have been idle too long are marked, and each session
+# releases its own data in its own script thread (see release_when_idle).
+class SessionRegistry:
+    def __init__(self, idle_seconds=IDLE_EVICT_SECONDS):
+        self.idle_seconds = idle_seconds
+        self.evictions = 0
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    # Record a script or fragment run of the session
+    def touch(self, session_id, state):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.state() is not state:
+                session = self._sessions[session_id] = _Session(state)
+            session.last_seen = time.monotonic()
+            session.evictable = False
+
+    def _live(self):
+        with self._lock:
+            for session_id, session in list(self._sessions.items()):
+                if session.state() is None:
+                    del self._sessions[session_id]
+                    discard_spill(session_id)
+            return list(self._sessions.items())
+
+    # Deep size of each live session's state: {session id: (idle seconds, {key: bytes})}
+    def session_sizes(self):
+        now = time.monotonic()
+        sizes = {}
+        for session_id, session in self._live():
+            state = session.state()
+            if state is None:
+                continue
+            try:
+                entries = state.filtered_state
+            except RuntimeError:
+                # Changed by the session's own run while being read; next time
+                continue
+            sizes[session_id] = (now - session.last_seen,
+                                 {key: deep_size(value) for key, value in entries.items()})
+        return sizes
+
+    # Mark the sessions idle for longer than idle_seconds; returns their ids
+    def mark_idle(self):
+        if self.idle_seconds <= 0:
+            return []
+        marked = []
+        now = time.monotonic()
+        for session_id, session in self._live():
+            with self._lock:
+                if not session.evictable and now - session.last_seen >= self.idle_seconds:
+                    session.evictable = True
+                    marked.append(session_id)
+        return marked
+
+    # Whether the session was marked idle; the mark is cleared
+    def take_evictable(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or not session.evictable:
+                return False
+            session.evictable = False
+            return True
+
+    def record_eviction(self):
+        with self._lock:
+            self.evictions += 1
+        EVICTIONS.inc()
+
+    # Trades held in memory by all live sessions
+    def tradelog_rows(self):
+        rows = 0
+        for session_id, session in self._live():
+            state = session.state()
+            tradelog = state["tradelog"] if state is not None and "tradelog" in state else None
+            rows += len(tradelog) if tradelog is not None else 0
+        return rows
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+def _sweep(registry):
+    while True:
+        time.sleep(SWEEP_SECONDS)
+        registry.mark_idle()
+
+
+# One registry per server process, with a background thread marking idle sessions
+# and forgetting ended ones. Tradelogs spilled by an earlier server process belong to
+# sessions that no longer exist.
+@st.cache_resource
+def get_session_registry():
+    shutil.rmtree(SPILL_DIR, ignore_errors=True)
+    registry = SessionRegistry()
+    threading.Thread(target=_sweep, args=(registry,), daemon=True,
+                     name="journal-session-sweeper").start()
+    return registry
+
+
+# Called once per script run (from make_sidebar) and fragment run (tracked_fragment).
+# A session whose data was released stays idle until it is resumed.
+def track_session():
+    ctx = get_script_run_ctx()
+    if ctx is None or RELEASED_KEY in st.session_state:
+        return
+    # The state object that lives as long as the session, not this run's wrapper of it
+    get_session_registry().touch(ctx.session_id, ctx.session_state._state)
+
+
+# st.fragment for the pages' fragments: a fragment rerun the user triggered counts as
+# the session being in use, so a page where the user only works in a fragment isn't
+# idle. Fragments on a timer (run_every) rerun without the user and don't count.
+def tracked_fragment(function=None, *, run_every=None):
+    def decorate(function):
+        if run_every is not None:
+            return st.fragment(function, run_every=run_every)
+
+        @functools.wraps(function)
+        def run(*args, **kwargs):
+            track_session()
+            return function(*args, **kwargs)
+        return st.fragment(run)
+    return decorate if function is None else decorate(function)
+
+
+# Runs in the sidebar of every logged-in session every SWEEP_SECONDS, in the
+# session's own script thread and without counting as activity. Once the sweeper has
+# marked the session idle, its tradelog is released here. The page's last full run
+# still refers to the frame (its globals, and the arguments its fragments and widget
+# callbacks were registered with) until another page run completes, so the session
+# moves to the main page, which offers to resume (render_resume).
+@st.fragment(run_every=SWEEP_SECONDS)
+def release_when_idle():
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    registry = get_session_registry()
+    if registry.take_evictable(ctx.session_id) and release_tradelog():
+        registry.record_eviction()
+        main_directory = os.path.dirname(ctx.main_script_path)
+        page = ctx.pages_manager.get_pages()[ctx.page_script_hash]
+        st.session_state[RELEASED_KEY] = os.path.relpath(page["script_path"], main_directory)
+        st.switch_page(os.path.basename(ctx.main_script_path))
+
+
+# Shown by the main page instead of the login form while the session's tradelog is
+# released; any page run resumes the session (resume_session) and reloads it
+def render_resume():
+    st.info("This session was idle, so its trade log was unloaded to free memory.")
+    if st.button("Resume"):
+        st.switch_page(st.session_state[RELEASED_KEY])
+
+
+def resume_session():
+    st.session_state.pop(RELEASED_KEY, None)
+
+
+# Totals over all live sessions
+def memory_stats():
+    registry = get_session_registry()
+    sizes = registry.session_sizes()
+    return {
+        "sessions": len(sizes),
+        "session_bytes": sum(sum(entries.values()) for idle, entries in sizes.values()),
+        "idle_sessions": sum(idle >= registry.idle_seconds for idle, entries in sizes.values()),
+        "evictions": registry.evictions,
+        "tradelog_rows": registry.tradelog_rows(),
+    }
+
+
+def _collect_metrics():
+    stats = memory_stats()
+    SESSIONS.set(stats["sessions"] - stats["idle_sessions"], state="active")
+    SESSIONS.set(stats["idle_sessions"], state="idle")
+    SESSION_BYTES.set(stats["session_bytes"])
+    STORE_ROWS.set(stats["tradelog_rows"], store="sessions")
+
+
+REGISTRY.add_collector(_collect_metrics)
+
+
+def _megabytes(size):
+    return size / 2 ** 20
+
+
+# Sidebar panel with the size of this session's state by key and of all sessions
+def render_memory_panel():
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    registry = get_session_registry()
+    sizes = registry.session_sizes()
+
+    with st.expander("Session memory"):
+        idle, entries = sizes.get(ctx.session_id, (0.0, {}))
+        rows = [{"Key": key, "MB": _megabytes(size)} for key, size in entries.items()]
+        if rows:
+            st.caption(f"This session: {_megabytes(sum(entries.values())):.1f} MB")
+            st.dataframe(pd.DataFrame(rows).sort_values("MB", ascending=False),
+                         hide_index=True, use_container_width=True,
+                         column_config={"MB": st.column_config.NumberColumn(format="%.2f")})
+
+        total = sum(sum(entries.values()) for idle, entries in sizes.values())
+        st.caption(f"All sessions: {len(sizes)}, {_megabytes(total):.1f} MB. "
+                   f"Idle sessions are evicted after {registry.idle_seconds / 60:g} min "
+                   f"({registry.evictions} so far).")
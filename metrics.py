@@ -0,0 +1,235 @@
+import logging
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+# Metrics are served in the Prometheus text format on http://127.0.0.1:<port>/metrics
+# when JOURNAL_METRICS_PORT is set, e.g. JOURNAL_METRICS_PORT=9464. Only the local
+# machine can scrape them.
+METRICS_PORT_ENV = "JOURNAL_METRICS_PORT"
+METRICS_HOST = "127.0.0.1"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_logger = logging.getLogger("journal.metrics")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# A metric holds one value (or histogram) per combination of its label values. All
+# of them are updated from script threads of any session, so changes take the lock.
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            # A metric without labels is exported from the start, at zero
+            self._values[()] = self._zero()
+
+    def _zero(self):
+        return 0
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _samples(self):
+        with self._lock:
+            return [(self.name, key, (), value) for key, value in sorted(self._values.items())]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for name, key, extra, value in self._samples():
+            lines.append(f"{name}{_labels(self.label_names, key, extra)} {_number(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, help_text, labels)
+
+    def _zero(self):
+        return [0] * len(self.buckets) + [0.0]
+
+    # value: [count per bucket..., sum]
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.setdefault(key, self._zero())
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += value
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            for key, counts in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, counts):
+                    samples.append((f"{self.name}_bucket", key, [("le", _number(bound))], count))
+                samples.append((f"{self.name}_sum", key, (), counts[-1]))
+                samples.append((f"{self.name}_count", key, (), counts[-2]))
+        return samples
+
+
+# Every metric of the server process. Values that are cheaper to read when scraped
+# than to keep current (cache sizes, session memory) come from collectors: functions
+# that set gauges right before the metrics are rendered.
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labels=()):
+        return self._add(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self._add(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def add_collector(self, collect):
+        with self._lock:
+            if collect not in self._collectors:
+                self._collectors.append(collect)
+
+    def render(self):
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        for collect in collectors:
+            try:
+                collect()
+            except Exception:
+                _logger.exception("Metrics collector %s failed", collect.__name__)
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+# Kept for the life of the process, like the version counter in trade_store: clearing
+# Streamlit's caches must not reset the counts
+REGISTRY = Registry()
+
+PAGE_RUNS = REGISTRY.counter(
+    "journal_page_runs_total", "Script runs started, by page.", ["page"])
+PAGE_RUN_SECONDS = REGISTRY.histogram(
+    "journal_page_run_seconds", "Duration of script runs that completed, by page.", ["page"])
+LOADER_REQUESTS = REGISTRY.counter(
+    "journal_loader_requests_total", "Reads through a shared loader cache.", ["loader"])
+LOADER_MISSES = REGISTRY.counter(
+    "journal_loader_misses_total", "Reads that missed the shared loader cache.", ["loader"])
+FETCH_SECONDS = REGISTRY.histogram(
+    "journal_tradelog_fetch_seconds", "Time to fetch and parse the shared tradelog.",
+    ["source"])
+WRITE_SECONDS = REGISTRY.histogram(
+    "journal_tradelog_write_seconds", "Time to write the tradelog to disk.")
+STORE_ROWS = REGISTRY.gauge(
+    "journal_trade_store_rows", "Trades in the shared tradelog, the last saved file and all session copies.",
+    ["store"])
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the server log
+
+
+# The metrics endpoint, started once per process on first use. Returns None when the
+# port is taken (e.g. by another app process).
+@st.cache_resource
+def start_metrics_server(port):
+    try:
+        server = ThreadingHTTPServer((METRICS_HOST, port), _MetricsHandler)
+    except OSError as e:
+        _logger.warning("Metrics endpoint not started on port %s: %s", port, e)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True,
+                     name="journal-metrics").start()
+    return server
+
+
+# Port set in JOURNAL_METRICS_PORT, or None if it is unset or isn't a port number
+def metrics_port():
+    value = os.environ.get(METRICS_PORT_ENV, "").strip()
+    if not value:
+        return None
+    try:
+        port = int(value)
+    except ValueError:
+        port = None
+    if port is None or not 0 < port < 65536:
+        _logger.warning("Metrics endpoint disabled: %s=%r is not a port number",
+                        METRICS_PORT_ENV, value)
+        return None
+    return port
+
+
+# Called once per server process (from init_process); does nothing unless a valid port
+# is set. Never raises into the page: a bad port or a failed bind is logged and the
+# endpoint stays off.
+def serve_metrics():
+    port = metrics_port()
+    if port is None:
+        return None
+    return start_metrics_server(port)
@@ -1,7 +1,49 @@
+import threading
+
 import streamlit as st
-from time import sleep
 from streamlit.runtime.scriptrunner import get_script_run_ctx
-from streamlit.source_util import get_pages
+
+from timing import start_run, timings_enabled, render_timing_panel
+from profiling import profiling_enabled, start_profile, render_profile_links, render_hotspots
+from memory import track_session, resume_session, release_when_idle, render_memory_panel
+from metrics import serve_metrics
+from prewarm import start_prewarm
+
+# Page name of every page of the app by script hash, shared by all sessions. Filled
+# from the runtime's own page list (the pages/ directory it scanned at startup, or
+# the pages an st.navigation call registered) the first time a hash isn't known, and
+# emptied when the runtime reports the pages changed, so a rerun's lookup is a dict
+# read and never rebuilds the page list.
+class PageRegistry:
+    def __init__(self):
+        self._names = {}
+        self._lock = threading.Lock()
+        self._watching = False
+
+    def _pages_changed(self, _path=None):
+        self._names = {}
+
+    def _load(self, pages_manager):
+        with self._lock:
+            if not self._watching:
+                pages_manager.register_pages_changed_callback(self._pages_changed)
+                self._watching = True
+            self._names = {page_hash: page.get("page_name", "")
+                           for page_hash, page in pages_manager.get_pages().items()}
+
+    def page_name(self, ctx):
+        name = self._names.get(ctx.page_script_hash)
+        if name is None:
+            self._load(ctx.pages_manager)
+            name = self._names.get(ctx.page_script_hash)
+            if name is None:
+                raise RuntimeError(f"Unknown page {ctx.page_script_hash!r}")
+        return name
+
+
+@st.cache_resource
+def get_page_registry():
+    return PageRegistry()
 
 # Identify the name of the currently active page
 def get_current_page_name():
@@ -9,12 +51,29 @@ def get_current_page_name():
     if ctx is None:
         raise RuntimeError("Couldn't get script context")
 
-    pages = get_pages("")
+    return get_page_registry().page_name(ctx)
 
-    return pages[ctx.page_script_hash]["page_name"]
+# One-time setup of the server process, done by its first script run: the metrics
+# endpoint (if configured) and the cache warm-up. Later runs only look it up.
+@st.cache_resource
+def init_process():
+    serve_metrics()
+    start_prewarm()
+    return True
 
 # Render a custom sidebar with navigation logic and control access based on authentication
 def make_sidebar():
+    init_process()
+    page_name = get_current_page_name()
+    start_run(page_name)
+    # A session released while idle waits on the main page; any other page resumes it
+    if page_name != "Journal_app":
+        resume_session()
+    track_session()
+    profiling = profiling_enabled()
+    if profiling:
+        start_profile(page_name)
+
     with st.sidebar:
         st.title("📑 Trading Journal")
         st.write("")
@@ -32,14 +91,27 @@ def make_sidebar():
             if st.button("Log out"):
                 logout()
 
-        elif get_current_page_name() != "Journal_app":
+            release_when_idle()
+
+            if timings_enabled():
+                render_timing_panel()
+                render_memory_panel()
+            if profiling:
+                render_profile_links()
+
+        elif page_name != "Journal_app":
             # If anyone tries to access a secret page without being logged in,
             # redirect them to the login page
             st.switch_page("Journal_app.py")
 
-# Log out by resetting the logged_in session state and redirect to the login page
+    if profiling and st.session_state.get("logged_in", False) and \
+            st.query_params.get("view_profile"):
+        render_hotspots(st.query_params["view_profile"])
+
+# Log out by resetting the logged_in session state and redirect to the login page,
+# which confirms it
 def logout():
     st.session_state.logged_in = False
-    st.info("Logged out successfully!")
-    sleep(0.5)
+    st.session_state.logged_out = True
+    resume_session()
     st.switch_page("Journal_app.py")
\ No newline at end of file
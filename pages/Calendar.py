@@ -1,55 +1,33 @@
 import pandas as pd
 import streamlit as st
 import calendar
-from datetime import datetime
-import os
 from navigation import make_sidebar
-import requests
-from io import StringIO
-
-def load_data():
-    url = 'https://raw.githubusercontent.com/hmh0490/streamlit-journal/refs/heads/master/tradelog_updated.csv'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return pd.read_csv(StringIO(response.text))
-    else:
-        st.error("Failed to load data from GitHub.")
-        return None
-
+from memory import tracked_fragment
+from trade_store import get_tradelog, get_version
+from rollups import calculate_daily_summary
+from timing import timed, timed_function, finish_run
 
 st.set_page_config(page_title="Trading Dashboard", layout="centered")
 
 make_sidebar()
 
-file_path = os.path.join(os.getcwd(), "tradelog_updated.csv")
-
-# Function to load the tradelog from disk if it exists
-def load_tradelog():
-    if os.path.exists(file_path):
-        return pd.read_csv(file_path)
-    else:
-        return None
-
-# Check if trade log data already exists in session_state
-if "tradelog" not in st.session_state:
-    st.session_state["tradelog"] = load_data()  # Load from disk if available
+# Load the trade log into session_state on first access
+with timed("Load data"):
+    tradelog = get_tradelog()
 
-# Ensure tradelog data is available
-if "tradelog" in st.session_state and st.session_state["tradelog"] is not None:
-    tradelog = st.session_state["tradelog"]
-    tradelog["Date"] = pd.to_datetime(tradelog["Date"])
-
-    available_years = sorted(tradelog["Date"].dt.year.unique())
 
-    # Get the most recent date available in the data
-    latest_date = st.session_state['tradelog']['Date'].max()
-    # # Extract the latest year and month
-    latest_year = latest_date.year
-    latest_month = latest_date.month
+# Month picker and calendar grid run as a fragment: moving to another month reruns
+# only this function, reusing the daily totals computed for the page
+@tracked_fragment
+@timed_function("Calendar grid")
+def render_calendar(daily_summary, available_years, latest_year, latest_month):
+    col1, col2, _ = st.columns([1, 1, 2])
 
-    # Sidebar inputs for year and month
-    year = st.sidebar.selectbox("Year", options=available_years, index=available_years.index(latest_year))
-    month_name = st.sidebar.selectbox("Month", options=list(calendar.month_name[1:]), index=latest_month-1)
+    # Inputs for year and month
+    with col1:
+        year = st.selectbox("Year", options=available_years, index=available_years.index(latest_year))
+    with col2:
+        month_name = st.selectbox("Month", options=list(calendar.month_name[1:]), index=latest_month-1)
     month = list(calendar.month_name).index(month_name)  # Convert month name to index
 
     # Get the weekday of the first day of the month and number of days in the selected month
@@ -104,21 +82,17 @@ if "tradelog" in st.session_state and st.session_state["tradelog"] is not None:
                 row_cells.append("<div class='calendar-cell neutral'></div>")
             else:
                 # Define the specific date for the day in the selected month
-                current_date = datetime(year, month, day_counter)
-
-                # Filter the tradelog for the current date
-                daily_trades = tradelog[
-                    (tradelog['Date'].dt.year == year) &
-                    (tradelog['Date'].dt.month == month) &
-                    (tradelog['Date'].dt.day == day_counter)]
+                current_date = pd.Timestamp(year, month, day_counter)
 
-                # Calculate PnL and trade count for the day
-                pnl = daily_trades['Net PnL'].sum()
-                trades = daily_trades.shape[0]
+                # Look up PnL and trade count for the day
+                if current_date in daily_summary.index:
+                    pnl, trades = daily_summary.loc[current_date, ["pnl", "trades"]]
+                else:
+                    pnl, trades = 0, 0
 
                 # Format PnL and trade count for display
                 pnl_text = f"${pnl:,.2f}" if pnl else "$0.00"
-                trade_text = f"{trades} Trades" if trades > 0 else "0 Trades"
+                trade_text = f"{int(trades)} Trades" if trades > 0 else "0 Trades"
 
                 # Set cell class based on PnL value
                 cell_class = "positive" if pnl > 0 else "negative" if pnl < 0 else "neutral"
@@ -136,6 +110,25 @@ if "tradelog" in st.session_state and st.session_state["tradelog"] is not None:
 
         # Render the row
         st.markdown(f"<div class='calendar-row'>{''.join(row_cells)}</div>", unsafe_allow_html=True)
+
+
+# Ensure tradelog data is available
+if tradelog is not None:
+    version = get_version()
+
+    available_years = sorted(tradelog["Date"].dt.year.unique())
+
+    # Get the most recent date available in the data
+    latest_date = st.session_state['tradelog']['Date'].max()
+    # # Extract the latest year and month
+    latest_year = latest_date.year
+    latest_month = latest_date.month
+
+    daily_summary = calculate_daily_summary(tradelog, version)
+
+    render_calendar(daily_summary, available_years, latest_year, latest_month)
 else:
     st.warning("Please upload your tradelog to proceed.")
     st.stop()
+
+finish_run()
@@ -1,40 +1,46 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import os
+from lazy_imports import lazy_import
+go = lazy_import("plotly.graph_objects")
 from navigation import make_sidebar
-import requests
-from io import StringIO
-
-def load_data():
-    url = 'https://raw.githubusercontent.com/hmh0490/streamlit-journal/refs/heads/master/tradelog_updated.csv'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return pd.read_csv(StringIO(response.text))
-    else:
-        st.error("Failed to load data from GitHub.")
-        return None
+from memory import tracked_fragment
+from trade_store import get_tradelog, get_version, set_tradelog, bump_version, save_tradelog
+from settings import get_settings, get_settings_version, get_ticker_data, save_settings
+from trade_grid import (KEY_COLUMN, PAGE_SIZES, sort_order, page_count, page_rows,
+                        merge_page_edits, mark_tradelog_edited, jump_to_trade)
+from filters import ORDER_STATES, get_trade_index, filter_trades
+from exports import render_download
+from positions import get_open_positions
+from tags import get_tag_index, parse_tags, format_tags
+from search import search_notes
+from calculations import (TRADE_INPUT_COLUMNS, trade_base, apply_fee_schedule,
+                          recalculate_trades, recalculate_rows, get_trade_base,
+                          compare_scenarios, running_balance)
+from downsample import downsample_indices
+from cashflows import FLOW_TYPES, LEDGER_COLUMNS, append_cashflow, get_ledger
+from figure_cache import plotly_chart
+from timing import timed, timed_function, finish_run
 
 # # Set the page configuration to wide layout
 st.set_page_config(page_title="Trading Dashboard", layout="centered")
 
 make_sidebar()
 
-# Retrieve settings from session_state
-risk_management_fee = st.session_state.get('risk_management_fee')
-ticker_data = st.session_state.get('ticker_data')
-initial_balance = st.session_state.get('initial_balance')
-withdrawals = st.session_state.get('withdrawals')
-
-file_path = os.path.join(os.getcwd(), "tradelog_updated.csv")
+# Retrieve the stored settings
+settings = get_settings()
+risk_management_fee = settings['risk_management_fee']
+ticker_data = get_ticker_data()
+initial_balance = settings['initial_balance']
 
 st.title('Trading Journal')
 
 tab1, tab2, tab3, tab4 = st.tabs(['New Entry', 'Trade Log', 'Filter', 'Settings'])
 
 # ****** NEW ENTRY ******
-with tab1:
+with tab1, timed("New Entry"):
     st.subheader(':green[New Entry]')
+    open_position = st.checkbox('Open position (not exited yet)')
     col1, col2, col3, col4, col5 = st.columns([0.5, 0.5, 0.5, 0.5, 0.57])
 
     with col1:
@@ -45,9 +51,11 @@ with tab1:
     with col2:
         date = st.date_input('Date')
         time = st.time_input('Time')
+        exit_time = st.time_input('Exit Time', disabled=open_position)
     with col3:
         entry_price = st.number_input('Entry Price', min_value=0.0, step=0.1, format="%.2f")
-        exit_price = st.number_input('Exit Price', min_value=0.0, step=0.1, format="%.2f")
+        exit_price = st.number_input('Exit Price', min_value=0.0, step=0.1, format="%.2f",
+                                     disabled=open_position)
     with col4:
         contract = st.number_input('Contracts', min_value=1, step=1, format="%d")
         setup = st.selectbox('Setup',
@@ -62,11 +70,28 @@ with tab1:
         emotion = st.selectbox('Emotion',
                                options=['By The Rules', 'Fear', 'Hope', 'Greed',
                                         'FOMO', 'Bored', 'Tired', 'Distracted'])
+    tags = st.text_input('Tags', placeholder='news day, scaled in, A+ setup')
+    notes = st.text_area('Notes', placeholder='Post-trade review: what went well, what to change')
+
+
+    # Fees, PnL and return of a trade closed at exit_price
+    def calculate_trade_result(ticker, direction, contract, entry_price, exit_price):
+        trade = pd.DataFrame([{"Ticker": ticker, "Direction": direction, "Contracts": contract,
+                               "Entry Price": entry_price, "Exit Price": exit_price}])
+        base = trade_base(trade, ticker_data)
+        result = apply_fee_schedule(base, risk_management_fee, 0.0)
+        return {
+            "Risk Management Fee": float(result["Risk Management Fee"][0]),
+            "Total Broker Fees": float(result["Total Broker Fees"][0]),
+            "PnL": float(result["PnL"][0]),
+            "Net PnL": float(result["Net PnL"][0]),
+            "Return %": float(base["return_pct"][0]) if entry_price else 0.0,
+        }
 
 
     # Define function to add trade
-    def add_trade(date, time, ticker, direction, contract, entry_price, exit_price, setup,
-                  entry_exit, emotion):
+    def add_trade(date, time, exit_time, ticker, direction, contract, entry_price, exit_price,
+                  setup, entry_exit, emotion, tags, notes, open_position):
 
         if "tradelog" in st.session_state and st.session_state["tradelog"] is not None and not \
                 st.session_state["tradelog"].empty:
@@ -91,48 +116,26 @@ with tab1:
             "Trade ID": trade_id,
             "Date": date,
             "Entry Time": time.strftime("%I:%M %p"),  # time.strftime("%H:%M"),
-            "Exit Time": None,  # Set to None or time if provided
+            # Open positions have no exit yet
+            "Exit Time": None if open_position else exit_time.strftime("%I:%M %p"),
             "Ticker": ticker,
             "Direction": direction,
             "Contracts": contract,
             "Entry Price": entry_price,
-            "Exit Price": exit_price,
+            "Exit Price": np.nan if open_position else exit_price,
             "Setup": setup,
             "Entry/Exit": entry_exit,
-            "Emotion": emotion
+            "Emotion": emotion,
+            "Tags": format_tags(parse_tags(tags)),
+            "Notes": notes
         }
-        # Check if ticker_data is a DataFrame with at least one row
-        if isinstance(ticker_data, pd.DataFrame) and not ticker_data.empty:
-            # Retrieve the broker fees if the ticker exists in ticker_data
-            broker_fees = \
-            ticker_data.loc[ticker_data['Ticker'] == ticker, 'Broker Fees'].values[
-                0] if ticker in ticker_data['Ticker'].values else 3
-        else:
-            # Default broker fee if ticker_data is empty or not a DataFrame
-            broker_fees = 3
-
-        # Calculate PnL and Net PnL
-        if direction == "LONG":
-            points = exit_price - entry_price
+        # Open positions realize nothing until they are closed
+        if open_position:
+            new_trade.update({"Risk Management Fee": np.nan, "Total Broker Fees": np.nan,
+                              "PnL": np.nan, "Net PnL": np.nan, "Return %": np.nan})
         else:
-            points = entry_price - exit_price
-        pnl = contract * points
-        risk_management_fee_value = (risk_management_fee / 100) * entry_price * contract
-        total_broker_fees = broker_fees * contract
-        net_pnl = pnl - risk_management_fee_value - total_broker_fees
-        percentage_return = round((exit_price - entry_price) / entry_price * 100,
-                                  2) if direction == "LONG" else round(
-            (entry_price - exit_price) / entry_price * 100, 2)
-
-        # Update the new trade entry with calculated fields
-        new_trade.update({
-
-            "Risk Management Fee": risk_management_fee_value,
-            "Total Broker Fees": total_broker_fees,
-            "PnL": pnl,
-            "Net PnL": net_pnl,
-            "Return %": percentage_return,
-        })
+            new_trade.update(calculate_trade_result(ticker, direction, contract, entry_price,
+                                                    exit_price))
         new_trade = pd.DataFrame([new_trade])
         return new_trade
 
@@ -147,18 +150,15 @@ with tab1:
     #         return None
 
 
-    # Check if trade log data already exists in session_state
-    if "tradelog" not in st.session_state:
-        # Load from disk if available
-        st.session_state["tradelog"] = load_data()
-
-    tradelog = st.session_state["tradelog"]
+    # Load the trade log into session_state on first access
+    tradelog = get_tradelog()
 
     # save button
     if st.button("Add Trade"):
         new_trade = add_trade(
             date=date,
             time=time,
+            exit_time=exit_time,
             ticker=ticker,
             direction=direction,
             contract=contract,
@@ -166,7 +166,10 @@ with tab1:
             exit_price=exit_price,
             setup=setup,
             entry_exit=entry_exit,
-            emotion=emotion)
+            emotion=emotion,
+            tags=tags,
+            notes=notes,
+            open_position=open_position)
 
         if "Cumulative Performance" in st.session_state["tradelog"].columns and not \
                 st.session_state["tradelog"].empty:
@@ -176,7 +179,8 @@ with tab1:
             last_cumulative_performance = initial_balance
 
         # Calculate metrics for new data
-        new_cumulative_performance = last_cumulative_performance + new_trade["Net PnL"]
+        new_cumulative_performance = running_balance(new_trade["Net PnL"],
+                                                     last_cumulative_performance)
         new_performance = (new_cumulative_performance / last_cumulative_performance - 1) * 100
 
         # Update the new trade dictionary and add to tradelog
@@ -186,32 +190,16 @@ with tab1:
 
         tradelog["20 MA"] = tradelog["Cumulative Performance"].rolling(window=20).mean()
 
-        tradelog.to_csv(file_path, index=False)  # Save updated tradelog to file
-        st.session_state["tradelog"] = tradelog  # Update session state with new trade
+        save_tradelog(tradelog)  # Save updated tradelog to file
+        set_tradelog(tradelog)  # Update session state with new trade
 
         st.success("Trade added successfully with updated performance metrics!")
 
-    # Define the calculation function
-    def calculate_pnl(log):
-        # Determine points based on trade direction
-        if log['Direction'] == 'Long':
-            points = log['Exit Price'] - log['Entry Price']
-        elif log['Direction'] == 'Short':
-            points = log['Entry Price'] - log['Exit Price']
-        else:
-            points = 0  # Set points to 0 if direction is not recognized
-
-        # Calculate PnL
-        pnl = log['Contracts'] * points * log['Point Dollar Value']
-
-        # Calculate Net PnL by applying both the risk management fee and brokerage fee
-        net_pnl = pnl - log['Risk Management Fee'] - log['Total Broker Fees']
-        return pd.Series([pnl, net_pnl])
-
-
     uploaded_file = st.file_uploader("Choose a CSV file", type=["csv"])
 
-    if uploaded_file is not None:
+    # Only process a file once; the uploader keeps returning it on every rerun
+    if uploaded_file is not None and \
+            st.session_state.get("imported_file_id") != uploaded_file.file_id:
         try:
             # Attempt to read the CSV file
             tradelog = pd.read_csv(uploaded_file)
@@ -224,90 +212,71 @@ with tab1:
             tradelog.reset_index(inplace=True)
             tradelog.rename(columns={'index': 'Trade ID'}, inplace=True)
 
-            # Merge with ticker data to add Point Dollar Value and Brokerage Fee
-            # Check if ticker_data exists before merging
-            tradelog = pd.DataFrame(tradelog)
-            tradelog_date = tradelog['Date']
-            tradelog_time = tradelog['Exit Time']
-            ticker_data = pd.DataFrame(ticker_data)
-            tradelog = tradelog.merge(ticker_data, on='Ticker', how='left')
-            tradelog['Risk Management Fee'] = risk_management_fee / 100 * tradelog[
-                'Entry Price'] * tradelog['Contracts']
-            tradelog['Total Broker Fees'] = tradelog['Broker Fees'] * tradelog['Contracts']
-
-            # Calculate Returns
-            if "Direction" in tradelog.columns:
-                # Calculate Percentage Return based on Direction
-                tradelog["Return %"] = np.where(
-                    tradelog["Direction"] == "Long",
-                    ((tradelog["Exit Price"] - tradelog["Entry Price"]) /
-                     tradelog["Entry Price"]) * 100,
-                    ((tradelog["Entry Price"] - tradelog["Exit Price"]) /
-                     tradelog["Entry Price"]) * 100
-                ).round(2)
-
-            # Apply calculations to each row and add new columns
-            tradelog[['PnL', 'Net PnL']] = tradelog.apply(calculate_pnl, axis=1)
-
-            # Now calculate cumulative performance, performance, and 20-period moving average
-            # Initialize Cumulative Performance list
-            cumulative_performance = []
-
-            # Iterate over the Net PnL column
-            for i, pnl in enumerate(tradelog['Net PnL']):
-                if i == 0:
-                    # First cumulative performance
-                    cumulative_performance.append(initial_balance + pnl)
-                else:
-                    # Add current Net PnL to previous Cumulative Performance
-                    cumulative_performance.append(cumulative_performance[i - 1] + pnl)
-
-            # Assign calculated values back to the DataFrame
-            tradelog['Cumulative Performance'] = cumulative_performance
-
-            #### Calculate Performance %
-            performance = []
-            for i, row in tradelog.iterrows():
-                if i == 0:
-                    # For the first row
-                    performance.append(((row['Cumulative Performance'] / initial_balance)-1) * 100)
-                else:
-                    # For subsequent rows
-                    prev_cum_performance = tradelog.loc[i - 1, 'Cumulative Performance']
-                    current_cum_performance = row['Cumulative Performance']
-                    performance.append(((current_cum_performance / prev_cum_performance) - 1) * 100)
-
-            # Add Performance % to the dataframe
-            tradelog['Performance %'] = performance
-
-
-            tradelog['20 MA'] = tradelog['Cumulative Performance'].rolling(window=20).mean()
-
-            tradelog.drop(columns=['Broker Fees', 'Point Dollar Value', 'Currency', 'Tick Size',
-                                   'Ticks per 1 point', 'Equals 1 point', 'Tick Dollar Value'],
-                          inplace=True)
+            # Recompute fees, PnL, returns and the running balance from the settings
+            tradelog = recalculate_trades(tradelog, risk_management_fee, ticker_data,
+                                          initial_balance)
 
             # Save the processed DataFrame to disk
-            tradelog.to_csv(file_path, index=False)
+            save_tradelog(tradelog)
 
             # Store the updated trade log with calculations in session_state
-            st.session_state["tradelog"] = tradelog
+            set_tradelog(tradelog)
+            st.session_state["imported_file_id"] = uploaded_file.file_id
 
             st.toast('Data Successfully Loaded and Saved ', icon='✅')
         except Exception as e:
             st.error(f"Error reading the CSV: {e}")
 
 #### DISPLAY TRADELOG IN TAB 2 ####
-with tab2:
+with tab2, timed("Trade Log"):
     st.subheader(':green[Trade Journal]')
 
-    if st.session_state['tradelog'] is not None and not st.session_state['tradelog'].empty:
-        st.session_state['tradelog']['Date'] = pd.to_datetime(
-            st.session_state['tradelog']['Date'], errors='coerce').dt.strftime('%Y-%m-%d')
+    # Paginated Trade Log grid, run as a fragment so paging and sorting rerun only the grid.
+    # Only the visible page is sent to the browser; edits are merged back by Trade ID.
+    @tracked_fragment
+    @timed_function("Trade grid")
+    def render_trade_grid():
+        tradelog = get_tradelog()
+        version = get_version()
+
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            sort_column = st.selectbox('Sort by', options=list(tradelog.columns),
+                                       index=list(tradelog.columns).index(KEY_COLUMN)
+                                       if KEY_COLUMN in tradelog.columns else 0,
+                                       key='tradelog_sort_column')
+        with col2:
+            sort_direction = st.selectbox('Order', options=['Ascending', 'Descending'],
+                                          key='tradelog_sort_direction')
+        with col3:
+            page_size = st.selectbox('Rows per page', options=PAGE_SIZES,
+                                     key='tradelog_page_size')
+
+        order = sort_order(tradelog, version, sort_column, sort_direction == 'Ascending')
+        pages = page_count(len(tradelog), page_size)
+        if st.session_state.get('tradelog_page', 1) > pages:
+            st.session_state['tradelog_page'] = pages
+
+        col1, col2, col3 = st.columns([1, 1, 2], vertical_alignment='bottom')
+        with col1:
+            page = st.number_input(f'Page (of {pages})', min_value=1, max_value=pages, step=1,
+                                   key='tradelog_page')
+        with col2:
+            st.number_input('Trade ID', min_value=1, step=1, key='tradelog_jump_id')
+        with col3:
+            st.button('Go to trade', on_click=jump_to_trade,
+                      args=(sort_column, sort_direction == 'Ascending', page_size))
+
+        if st.session_state.pop('tradelog_jump_missing', False):
+            st.error(f"Trade with ID {st.session_state['tradelog_jump_id']} not found.")
 
-        updated_tradelog = st.data_editor(
-            st.session_state['tradelog'],
+        edited_page = st.data_editor(
+            page_rows(tradelog, order, page, page_size),
+            key='tradelog_editor',
+            on_change=mark_tradelog_edited,
+            disabled=[KEY_COLUMN],
             column_config={
+                'Date': st.column_config.DateColumn(format='YYYY-MM-DD'),
                 'Ticker': st.column_config.TextColumn('Ticker', width='small'),
                 'Entry Price': st.column_config.NumberColumn(format="$%.2f"),
                 'Exit Price': st.column_config.NumberColumn(format="$%.2f"),
@@ -328,19 +297,92 @@ with tab2:
                 'Risk Management Fee': st.column_config.NumberColumn(format="$%.2f"),
                 'PnL': st.column_config.NumberColumn(format="$%.2f"),
                 'Net PnL': st.column_config.NumberColumn(format="$%.2f"),
+                'Tags': st.column_config.TextColumn(help='Comma separated, e.g. news day, scaled in'),
+                'Notes': st.column_config.TextColumn(width='large'),
             }, use_container_width=True)
 
-        # Save the edited version back to session_state
-        st.session_state['tradelog'] = updated_tradelog
+        # Merge the edited rows back into the tradelog; the edit gets a new version.
+        # Edited prices, sizes or tickers change the fees, PnL and every later balance.
+        if st.session_state.pop('tradelog_edited', False):
+            changed = merge_page_edits(tradelog, edited_page)
+            edited_rows = [changed[column] for column in TRADE_INPUT_COLUMNS if column in changed]
+            if edited_rows:
+                set_tradelog(recalculate_rows(tradelog, np.unique(np.concatenate(edited_rows)),
+                                              risk_management_fee, ticker_data, initial_balance))
+                st.rerun()  # Show the recomputed columns
+            else:
+                bump_version()
+
+    if st.session_state['tradelog'] is not None and not st.session_state['tradelog'].empty:
+        # Search the trade notes; results are ranked by relevance
+        notes_query = st.text_input('Search notes', placeholder='e.g. chased entry news',
+                                    key='notes_query')
+        if notes_query:
+            results = search_notes(st.session_state['tradelog'], get_version(), notes_query)
+            if results.empty:
+                st.info("No notes match your search.")
+            else:
+                st.dataframe(results[['Score', 'Trade ID', 'Date', 'Ticker', 'Net PnL', 'Notes']],
+                             hide_index=True, use_container_width=True,
+                             column_config={
+                                 'Score': st.column_config.NumberColumn(format="%.2f"),
+                                 'Date': st.column_config.DateColumn(format='YYYY-MM-DD'),
+                                 'Net PnL': st.column_config.NumberColumn(format="$%.2f"),
+                             })
+            st.divider()
+
+        render_trade_grid()
 
         # Save button to persist changes made in the editor
         if st.button("Save Changes"):
-            st.session_state['tradelog'].to_csv(file_path, index=False)
+            save_tradelog(st.session_state['tradelog'])
 
             st.success("Changes saved successfully!")
 
         st.divider()  # For visual separation
 
+        # Close Position Section: realize an open position at its exit price
+        open_positions = get_open_positions(st.session_state['tradelog'], get_version())
+        if not open_positions.empty:
+            st.subheader(':orange[Close Position]')
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                close_trade_id = st.selectbox('Open Trade ID',
+                                              options=open_positions['Trade ID'].tolist())
+            with col2:
+                close_price = st.number_input('Exit Price', min_value=0.0, step=0.1,
+                                              format="%.2f", key='close_exit_price')
+            with col3:
+                close_time = st.time_input('Exit Time', key='close_exit_time')
+
+            if st.button("Close Position"):
+                tradelog = st.session_state['tradelog'].copy()
+                row = tradelog.index[tradelog['Trade ID'] == close_trade_id][0]
+                trade = tradelog.loc[row]
+                result = calculate_trade_result(trade['Ticker'], trade['Direction'],
+                                                trade['Contracts'], trade['Entry Price'],
+                                                close_price)
+                tradelog.loc[row, 'Exit Price'] = close_price
+                tradelog.loc[row, 'Exit Time'] = close_time.strftime("%I:%M %p")
+                for column, value in result.items():
+                    tradelog.loc[row, column] = value
+
+                # The realized PnL moves the running balance of every later trade
+                net_pnl = tradelog['Net PnL'].fillna(0)
+                starting_balance = tradelog['Cumulative Performance'].iloc[0] - net_pnl.iloc[0]
+                tradelog['Cumulative Performance'] = running_balance(net_pnl, starting_balance)
+                previous = tradelog['Cumulative Performance'].shift(1).fillna(starting_balance)
+                tradelog['Performance %'] = (tradelog['Cumulative Performance'] / previous - 1) * 100
+                tradelog['20 MA'] = tradelog['Cumulative Performance'].rolling(window=20).mean()
+
+                save_tradelog(tradelog)
+                set_tradelog(tradelog)
+                st.success(f"Position {close_trade_id} closed with Net PnL "
+                           f"${result['Net PnL']:,.2f}.")
+
+            st.divider()
+
         # Remove Trade Section
         st.subheader(':red[Remove Trade]')
 
@@ -355,11 +397,12 @@ with tab2:
             if st.button("Remove Trade"):
                 # Check if Trade ID exists
                 if remove_trade_id in st.session_state['tradelog']['Trade ID'].values:
-                    # Remove the trade with the specified Trade ID
-                    st.session_state['tradelog'] = st.session_state['tradelog'][
-                        st.session_state['tradelog']['Trade ID'] != remove_trade_id
-                        ]
-                    st.session_state['tradelog'].to_csv(file_path, index=False)
+                    # Remove the trade with the specified Trade ID; normalize writes to
+                    # the frame, so it gets a copy rather than a view of the old log
+                    tradelog = st.session_state['tradelog']
+                    set_tradelog(tradelog.loc[tradelog['Trade ID'] != remove_trade_id]
+                                 .reset_index(drop=True).copy())
+                    save_tradelog(st.session_state['tradelog'])
 
                     st.success(
                         f"Trade with ID {remove_trade_id} removed successfully! Please refresh the page")
@@ -370,92 +413,90 @@ with tab2:
         st.write("No data loaded. Please upload a CSV file.")
 
 ###### FILTER #####
-with tab3:
-    def filter_ui():
-        """UI for filtering trades based on various criteria."""
-        filter_value = None
-
-        with st.container():
+with tab3, timed("Filter"):
+    def filter_ui(index, tag_index):
+        """UI for filtering trades on several criteria at once."""
+        with st.form('filter_form'):
             st.subheader(':green[Filter Trades]')
             col1, col2 = st.columns(2)
 
             with col1:
-                choice = st.selectbox('Filter Trades By', options=[
-                    'Trade ID', 'Ticker', 'Date', 'Direction', 'Order State'])
+                date_range = st.date_input('Date Range', value=(), key='filter_date')
+                tickers = st.multiselect('Ticker', options=index.options('Ticker'))
+                setups = st.multiselect('Setup', options=index.options('Setup'))
+                emotions = st.multiselect('Emotion', options=index.options('Emotion'))
 
             with col2:
-                # Allow user to input filter value based on the selected filter choice
-                if choice == 'Ticker':
-                    filter_value = st.text_input('Enter Ticker', max_chars=4,
-                                                 placeholder='Symbol')
-                elif choice == 'Trade ID':
-                    filter_value = st.number_input('Enter Trade ID', min_value=1, step=1,
-                                                   key='filter_trade_id')
-                elif choice == 'Date':
-                    filter_value = st.date_input('Select Date', key='filter_date')
-                elif choice == 'Direction':
-                    filter_value = st.selectbox('Select Direction',
-                                                options=['All', 'Long', 'Short'])
-                elif choice == 'Order State':
-                    filter_value = st.selectbox('Select Order State',
-                                                options=['Open', 'Closed'])
-
-        return choice, filter_value
+                trade_id = st.number_input('Trade ID', min_value=1, step=1, value=None,
+                                           key='filter_trade_id')
+                directions = st.multiselect('Direction', options=index.options('Direction'))
+                order_state = st.multiselect('Order State', options=ORDER_STATES)
+                pnl_col1, pnl_col2 = st.columns(2)
+                with pnl_col1:
+                    pnl_min = st.number_input('Min Net PnL', value=None, step=10.0)
+                with pnl_col2:
+                    pnl_max = st.number_input('Max Net PnL', value=None, step=10.0)
+
+            tag_query = st.text_input(
+                'Tags', placeholder='news day AND (scaled in OR "a+ setup") AND NOT revenge',
+                help='Combine tags with AND, OR, NOT and parentheses. Known tags: ' +
+                     (', '.join(tag_index.tags()) or 'none yet'))
+
+            # Button to show filtered results
+            show_results = st.form_submit_button('Show Results')
+
+        # A single picked date filters on that day only
+        if len(date_range) == 1:
+            date_range = (date_range[0], date_range[0])
+
+        return show_results, {
+            'date_range': date_range, 'trade_id': trade_id,
+            'Ticker': tickers, 'Setup': setups, 'Direction': directions,
+            'Emotion': emotions, 'Order State': order_state,
+            'pnl_min': pnl_min, 'pnl_max': pnl_max, 'tags': tag_query}
 
 
-    # Get filter criteria
-    choice, filter_value = filter_ui()
-
-    # Button to show filtered results
-    show_results = st.button('Show Results')
+    # Check if tradelog is available in session state
+    tradelog = st.session_state.get("tradelog")
+    if tradelog is not None:
+        version = get_version()
 
-    # Divider for visual separation
-    st.divider()
+        # Get filter criteria; results stay visible until the criteria are submitted again
+        show_results, criteria = filter_ui(get_trade_index(tradelog, version),
+                                           get_tag_index(tradelog, version))
+        if show_results:
+            st.session_state['filter_criteria'] = criteria
 
-    st.subheader(':green[Filter Results]')
+        # Divider for visual separation
+        st.divider()
 
-    # Check if tradelog is available in session state
-    if "tradelog" in st.session_state:
-        tradelog = st.session_state["tradelog"]
+        st.subheader(':green[Filter Results]')
 
         # Filtering logic
-        if show_results:
-            filtered_trades = tradelog.copy()
-
-            if choice == 'Trade ID' and filter_value:
-                filtered_trades = filtered_trades[
-                    filtered_trades['Trade ID'] == int(filter_value)]
-            elif choice == 'Ticker' and filter_value:
-                filtered_trades = filtered_trades[
-                    filtered_trades['Ticker'].str.upper() == filter_value.upper()]
-            elif choice == 'Date' and filter_value:
-                filtered_trades = filtered_trades[
-                    filtered_trades['Date'] == pd.to_datetime(filter_value)]
-            elif choice == 'Direction' and filter_value != 'All':
-                filtered_trades = filtered_trades[filtered_trades['Direction'] == filter_value]
-            elif choice == 'Order State':
-                # Determine "Closed" if Exit Time is not None, otherwise "Open"
-                if filter_value == 'Closed':
-                    filtered_trades = filtered_trades[filtered_trades['Exit Time'].notnull()]
-                elif filter_value == 'Open':
-                    filtered_trades = filtered_trades[filtered_trades['Exit Time'].isnull()]
+        if 'filter_criteria' in st.session_state:
+            try:
+                filtered_trades = filter_trades(tradelog, version,
+                                                st.session_state['filter_criteria'])
+            except ValueError as e:
+                st.error(f"Invalid tag query: {e}")
+                filtered_trades = None
 
             # Display filtered results
-            if not filtered_trades.empty:
+            if filtered_trades is None:
+                pass
+            elif not filtered_trades.empty:
                 st.dataframe(filtered_trades)
 
-                # Option to export filtered results to CSV
-                if st.button('Export to CSV'):
-                    filtered_trades.to_csv('tradelog_filtered.csv', index=False)
-                    st.success(
-                        "Filtered data exported to 'tradelog_filtered.csv' successfully!")
+                # Option to download the filtered results
+                render_download(filtered_trades, version, st.session_state['filter_criteria'],
+                                'tradelog_filtered', key='filter_export')
             else:
                 st.warning("No trades found matching the filter criteria.")
     else:
         st.warning("No trade log data available. Please upload your trade log.")
 
 ##### BACKGROUND DATA #####
-with tab4:
+with tab4, timed("Settings"):
     # Page Title
     st.title("Settings")
 
@@ -466,116 +507,111 @@ with tab4:
     with col1:
         initial_balance = st.number_input(
             "Enter your initial balance:", min_value=0.0,
-            value=50000.0, step=100.0)
+            value=float(settings['initial_balance']), step=100.0)
         risk_management_fee = st.number_input(
             "Enter risk management fee (%):",
             min_value=0.0, max_value=100.0,
-            value=2.0, step=0.1)
+            value=float(settings['risk_management_fee']), step=0.1)
     st.write(
         f"Your initial balance is set to: ${initial_balance:,.2f}")
     st.write(
         f"The current risk management fee is set to: {risk_management_fee}%")
 
-    # Data for the Ticker Table
-    ticker_data = {
-        "Ticker": ["ES", "MES", "YM", "MYM", "GC", "MGC", "CL", "MCL",
-                   "NQ", "MNQ"],
-        "Tick Size": [0.25, 0.25, 1, 1, 0.1, 0.1, 0.01, 0.01, 0.25,
-                      0.25],
-        "Ticks per 1 point": [4, 4, 1, 1, 10, 10, 100, 100, 4, 4],
-        "Equals 1 point": [1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        "Tick Dollar Value": [12.5, 1.25, 5, 0.5, 10, 1, 10, 1, 5,
-                              0.5],
-        "Point Dollar Value": [50, 5, 5, 0.5, 100, 10, 1000, 100, 20,
-                               2],
-        "Currency": ["USD"] * 10,
-        "Broker Fees": [3] * 10
-    }
-
     # Display the Ticker Table
     st.subheader("Ticker Information")
-    ticker_data = st.data_editor(ticker_data)
-
-    # Store settings in session_state for consistent access across pages
-    st.session_state['initial_balance'] = initial_balance
-    st.session_state['risk_management_fee'] = risk_management_fee
-    st.session_state['ticker_data'] = ticker_data
-
-    ############# Section for Withdrawals ############
-    # Define the file path for storing withdrawals
-    withdrawals_file = "../withdrawals.csv"
-
-
-    # Function to save withdrawals to CSV
-    def save_withdrawals_to_csv():
-        if st.session_state['withdrawals']:
-            withdrawals_df = pd.DataFrame(st.session_state['withdrawals'])
-            withdrawals_df.to_csv(withdrawals_file, index=False)
-
-
-    # Initialize the session state for withdrawals
-    if "withdrawals" not in st.session_state:
-        if os.path.exists(withdrawals_file):
-            # Load withdrawals from the CSV file if it exists
-            st.session_state['withdrawals'] = pd.read_csv(withdrawals_file).to_dict(
-                orient='records')
-            st.success("Withdrawals loaded from file!")
-        else:
-            st.session_state['withdrawals'] = []
-
-    st.subheader("Withdrawals Information")
-
-    # Use columns to control the width of input fields
-    col1, col2, col3 = st.columns([1, 1, 1])  # Adjust the column width as needed
+    ticker_data = st.data_editor(get_ticker_data())
+
+    # Persist changed settings; only data derived from the settings is recomputed
+    if save_settings(initial_balance, risk_management_fee, ticker_data):
+        st.toast('Settings saved', icon='✅')
+
+    has_trades = st.session_state.get('tradelog') is not None and \
+        not st.session_state['tradelog'].empty
+
+    # Settings apply to new trades; this re-derives the whole history from them
+    if has_trades and st.button("Recalculate trade history with these settings"):
+        set_tradelog(recalculate_trades(st.session_state['tradelog'], risk_management_fee,
+                                        ticker_data, initial_balance))
+        save_tradelog(st.session_state['tradelog'])
+        st.success("Fees, PnL and performance recalculated for every trade.")
+
+    # What-if scenarios: several fee schedules over the full history, side by side
+    st.subheader("What-if Scenarios")
+    scenarios = st.data_editor(
+        pd.DataFrame({
+            'Scenario': ['Current', 'No Risk Fee', 'Higher Fees'],
+            'Risk Management Fee (%)': [risk_management_fee, 0.0, risk_management_fee + 1],
+            'Broker Fee per Contract': [None, None, 5.0],
+            'Initial Balance': [initial_balance] * 3,
+        }),
+        num_rows='dynamic', hide_index=True, use_container_width=True, key='fee_scenarios',
+        column_config={
+            'Broker Fee per Contract': st.column_config.NumberColumn(
+                help='Leave empty to use the fees from the ticker table', format="$%.2f"),
+            'Initial Balance': st.column_config.NumberColumn(format="$%.2f"),
+        })
 
-    # Form to input a new withdrawal
+    scenarios = [
+        {**row, 'Broker Fee per Contract': None if pd.isna(row['Broker Fee per Contract'])
+                                           else row['Broker Fee per Contract']}
+        for row in scenarios.to_dict(orient='records')
+        if row['Scenario'] and pd.notna(row['Risk Management Fee (%)'])
+        and pd.notna(row['Initial Balance'])]
+
+    if has_trades and scenarios:
+        base = get_trade_base(st.session_state['tradelog'], get_version(), get_ticker_data(),
+                              get_settings_version())
+        comparison, balances = compare_scenarios(base, scenarios)
+        st.dataframe(comparison, hide_index=True, use_container_width=True,
+                     column_config={
+                         'Total Fees': st.column_config.NumberColumn(format="$%.2f"),
+                         'Net PnL': st.column_config.NumberColumn(format="$%.2f"),
+                         'Final Balance': st.column_config.NumberColumn(format="$%.2f"),
+                         'Return %': st.column_config.NumberColumn(format="%.2f%%"),
+                         'Max Drawdown': st.column_config.NumberColumn(format="$%.2f"),
+                     })
+
+        # Running balance of each scenario, downsampled for long histories
+        fig = go.Figure()
+        for name, balance in balances.items():
+            shown = downsample_indices(balance)
+            fig.add_trace(go.Scattergl(x=shown + 1, y=balance[shown], mode='lines', name=name))
+        fig.update_layout(title="Balance by Scenario", xaxis_title="Trade",
+                          yaxis_title="Balance ($)", height=400)
+        plotly_chart(fig, use_container_width=True)
+
+    ############# Section for Deposits and Withdrawals ############
+    st.subheader("Deposits and Withdrawals")
+
+    # Form to input a new deposit or withdrawal
     with st.form(key='withdrawal_form'):
+        col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
         with col1:
-            withdrawal_date = st.date_input("Date of Withdrawal")
+            flow_type = st.selectbox("Type", options=FLOW_TYPES)
         with col2:
-            withdrawal_amount = st.number_input("Amount", min_value=0.0, value=0.0, step=100.0)
+            withdrawal_date = st.date_input("Date")
         with col3:
+            withdrawal_amount = st.number_input("Amount", min_value=0.0, value=0.0, step=100.0)
+        with col4:
             withdrawal_currency = st.selectbox("Currency",
                                                options=["USD"])
 
         # Submit button for the form
-        submit_button = st.form_submit_button(label="Add Withdrawal")
-
-    # Adding a new withdrawal entry when the form is submitted
-    if submit_button:
-        new_withdrawal = {
-            "Date": withdrawal_date,
-            "Amount": withdrawal_amount,
-            "Currency": withdrawal_currency
-        }
-
-        # Append the new withdrawal to the session state
-        st.session_state['withdrawals'].append(new_withdrawal)
-        # st.success("Withdrawal added successfully!")
-
-        # Save the updated withdrawals to CSV
-        save_withdrawals_to_csv()
-
-    # Display the withdrawals table if there are any entries
-    if st.session_state['withdrawals']:
-        st.markdown("### Withdrawals List")
-        withdrawals_df = pd.DataFrame(st.session_state['withdrawals'])
-        st.dataframe(withdrawals_df)
-
-import pandas as pd
-import os
-
-# Define the data to save
-data = {'Column1': [1, 2, 3], 'Column2': [4, 5, 6]}
-df = pd.DataFrame(data)
-
-# Build the path relative to the "pages" directory
-file_path = os.path.join(os.getcwd(), "test.csv")
-
-# Resolve the path to the absolute path
-absolute_file_path = os.path.abspath(file_path)
-
-# Save the file
-df.to_csv(absolute_file_path, index=False)
-
-print("File saved at:", absolute_file_path)
\ No newline at end of file
+        submit_button = st.form_submit_button(label="Add")
+
+    # Append the new entry to the ledger file
+    if submit_button and withdrawal_amount > 0:
+        append_cashflow(withdrawal_date, withdrawal_amount, withdrawal_currency, flow_type)
+        st.success(f"{flow_type} of ${withdrawal_amount:,.2f} recorded.")
+
+    # Display the ledger if there are any entries
+    ledger = get_ledger()
+    if not ledger.empty:
+        st.markdown("### Cash Flows")
+        st.dataframe(ledger[LEDGER_COLUMNS], hide_index=True,
+                     column_config={
+                         'Date': st.column_config.DateColumn(format='YYYY-MM-DD'),
+                         'Amount': st.column_config.NumberColumn(format="$%.2f"),
+                     })
+
+finish_run()
@@ -0,0 +1,21 @@
+import streamlit as st
+
+from timing import timed
+
+
+# Render a tab-like selector and return the label of the active panel.
+# Unlike st.tabs, which executes every tab body on each rerun, only the
+# panel that is actually visible needs to be computed.
+def lazy_tabs(labels, key):
+    return st.radio("Section", labels, horizontal=True, key=key,
+                    label_visibility="collapsed")
+
+
+# Show the selector and run only the renderer registered for the active panel.
+# `panels` maps each label to a zero-argument callable.
+def render_lazy_panels(panels, key):
+    active = lazy_tabs(list(panels), key)
+    st.divider()
+    with timed(active):
+        panels[active]()
+    return active
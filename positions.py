@@ -0,0 +1,107 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from calculations import open_trades
+
+# Local price feed: a CSV of "Ticker,Price" lines that another process appends to.
+# The latest line for a ticker is its current price.
+PRICE_FEED_PATH = os.path.join(os.getcwd(), "prices.csv")
+
+# How often the dashboard re-reads the feed, in seconds
+PRICE_POLL_SECONDS = 5
+
+POSITION_COLUMNS = ["Trade ID", "Date", "Ticker", "Direction", "Contracts", "Entry Price"]
+
+
+# Tails the price feed: each poll reads only the bytes appended since the last one,
+# and starts over if the file is replaced or truncated
+class PriceFeed:
+    def __init__(self, path):
+        self.path = path
+        self.prices = {}
+        self.updated = None
+        self._offset = 0
+        self._inode = None
+        self._lock = threading.Lock()
+
+    def poll(self):
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return dict(self.prices)
+
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                self.prices = {}
+                self._offset = 0
+                self._inode = stat.st_ino
+
+            if stat.st_size > self._offset:
+                with open(self.path, "rb") as feed:
+                    feed.seek(self._offset)
+                    data = feed.read(stat.st_size - self._offset)
+                # Leave a partly written last line for the next poll
+                end = data.rfind(b"\n") + 1
+                self._offset += end
+                for line in data[:end].decode(errors="replace").splitlines():
+                    self._read_line(line)
+                self.updated = pd.Timestamp(stat.st_mtime, unit="s")
+
+            return dict(self.prices)
+
+    def _read_line(self, line):
+        fields = [field.strip() for field in line.split(",")]
+        if len(fields) < 2:
+            return
+        try:
+            price = float(fields[1])
+        except ValueError:
+            return  # Header or malformed line
+        self.prices[fields[0].upper()] = price
+
+
+# One feed reader per server process, shared by every session
+@st.cache_resource
+def get_price_feed():
+    return PriceFeed(PRICE_FEED_PATH)
+
+
+# The open positions of a tradelog version, kept apart from the closed history so
+# marking them to market never touches the rest of the log. Shared between sessions
+# (the underscore keeps the frame unhashed); callers must not modify the result.
+@st.cache_resource(max_entries=16, show_spinner=False)
+def get_open_positions(_tradelog, version):
+    tradelog = _tradelog
+    columns = [column for column in POSITION_COLUMNS if column in tradelog.columns]
+    return tradelog.loc[open_trades(tradelog), columns].reset_index(drop=True)
+
+
+# Dollar value of a one point move per ticker, from the Settings ticker table
+def point_values(ticker_data):
+    if ticker_data is None:
+        return {}
+    ticker_data = pd.DataFrame(ticker_data)
+    if ticker_data.empty or "Point Dollar Value" not in ticker_data.columns:
+        return {}
+    return dict(zip(ticker_data["Ticker"].str.upper(), ticker_data["Point Dollar Value"]))
+
+
+# Mark open positions to the latest prices. Positions without a price are carried
+# at their entry price (no unrealized PnL); unknown tickers move $1 per point.
+def mark_to_market(positions, prices, values):
+    marked = positions.copy()
+    tickers = marked["Ticker"].astype(str).str.upper()
+    marked["Mark"] = tickers.map(prices).astype(float)
+    marked["Priced"] = marked["Mark"].notna()
+    marked["Mark"] = marked["Mark"].fillna(marked["Entry Price"])
+
+    point_value = tickers.map(values).fillna(1).astype(float)
+    sign = np.where(marked["Direction"] == "Long", 1, -1)
+    marked["Unrealized PnL"] = \
+        sign * (marked["Mark"] - marked["Entry Price"]) * marked["Contracts"] * point_value
+    marked["Exposure"] = sign * marked["Mark"] * marked["Contracts"] * point_value
+    return marked
@@ -0,0 +1,129 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from lazy_imports import preload
+from trade_store import tradelog_source, _load_shared
+from settings import get_settings, get_settings_version, get_ticker_data
+from cashflows import get_ledger, ledger_version, calculate_cash_flow_summary
+from calculations import get_trade_base
+from filters import get_trade_index
+from tags import get_tag_index, calculate_tag_statistics
+from search import get_notes_index
+from positions import get_open_positions
+from trade_grid import KEY_COLUMN, sort_order
+from rollups import build_common_rollups
+
+# Set JOURNAL_PREWARM=0 to turn the warm-up off, e.g. to measure cold pages
+PREWARM_ENV = "JOURNAL_PREWARM"
+
+# Seconds each warm-up step took in the last warm-up, in order
+WARMUP_SECONDS = {}
+
+# Workers loading tradelogs for sessions that just logged in
+PREFETCH_WORKERS = 4
+
+_logger = logging.getLogger("journal.prewarm")
+
+PREWARM_THREAD = "journal-prewarm"
+PREFETCH_THREAD = "journal-prefetch"
+
+
+# The warm-up and prefetch call the cached loaders outside any script run, which
+# Streamlit warns about on every call; that is expected for these threads only
+class _NoContextWarningFilter(logging.Filter):
+    def filter(self, record):
+        return not record.threadName.startswith((PREWARM_THREAD, PREFETCH_THREAD))
+
+
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+    _NoContextWarningFilter())
+
+
+def _step(name, work):
+    start = time.perf_counter()
+    try:
+        work()
+    except Exception:
+        _logger.exception("Warm-up step %s failed", name)
+    WARMUP_SECONDS[name] = time.perf_counter() - start
+
+
+def _warm_plotly():
+    go = preload("plotly.graph_objects")
+    preload("plotly.express")
+    # The first figure loads Plotly's templates and property validators
+    go.Figure(go.Scatter(x=[0], y=[0])).to_json()
+
+
+# Load what the first page after login needs, so the first session doesn't wait on
+# it: the shared tradelog, settings and ledger, the rollups shared between sessions
+# (sessions start on the shared log's version, so these are their cache entries too)
+# and Plotly. A step that fails is logged and left to the page, which reports it.
+def _warm_up():
+    loaded = {}
+    _step("Plotly", _warm_plotly)
+    _step("Tradelog", lambda: loaded.update(shared=_load_shared(tradelog_source())))
+    _step("Settings", lambda: (get_settings(), get_ticker_data()))
+    _step("Ledger", get_ledger)
+    if "shared" not in loaded:
+        return
+    tradelog, version = loaded["shared"]
+    _step("Trade grid order", lambda: sort_order(tradelog, version, KEY_COLUMN, True))
+    _step("Open positions", lambda: get_open_positions(tradelog, version))
+    _step("Filter index", lambda: (get_trade_index(tradelog, version),
+                                   get_tag_index(tradelog, version),
+                                   get_notes_index(tradelog, version)))
+    _step("Tag statistics", lambda: calculate_tag_statistics(tradelog, version))
+    _step("Trade base", lambda: get_trade_base(tradelog, version, get_ticker_data(),
+                                               get_settings_version()))
+    _step("Cash flows", lambda: calculate_cash_flow_summary(tradelog, version, ledger_version(),
+                                                            get_settings_version()))
+    _step("Rollups", lambda: build_common_rollups(tradelog, version))
+    _logger.info("Warm-up finished in %.2f s", sum(WARMUP_SECONDS.values()))
+
+
+# Started by the first script run of the server process (from make_sidebar), i.e.
+# while the first visitor is still on the login page
+@st.cache_resource
+def start_prewarm():
+    if os.environ.get(PREWARM_ENV) == "0":
+        return None
+    thread = threading.Thread(target=_warm_up, daemon=True, name=PREWARM_THREAD)
+    thread.start()
+    return thread
+
+
+# One pool per server process for the login prefetch
+@st.cache_resource
+def get_prefetch_pool():
+    return ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix=PREFETCH_THREAD)
+
+
+def _build_rollups(tradelog, version):
+    try:
+        build_common_rollups(tradelog, version)
+    except Exception:
+        _logger.exception("Building rollups for version %s failed", version)
+
+
+# The session's copy of the shared tradelog; the common rollups for its version are
+# queued behind it, so the first page doesn't wait for them
+def _prefetch(source):
+    tradelog, version = _load_shared(source)
+    get_prefetch_pool().submit(_build_rollups, tradelog, version)
+    return tradelog.copy(), version
+
+
+# Called when the user logs in: start loading the session's tradelog on a worker, so
+# the fetch and parse overlap with switching to the first page. get_tradelog() waits
+# for it (showing a spinner) instead of loading the log inside the page run.
+def start_prefetch():
+    if "tradelog" in st.session_state or "tradelog_future" in st.session_state:
+        return
+    st.session_state["tradelog_future"] = get_prefetch_pool().submit(
+        _prefetch, tradelog_source())
@@ -0,0 +1,186 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+# Profiling is opt-in: set JOURNAL_PROFILE=1, or open a page with ?profile=1 while
+# logged in
+PROFILE_ENV = "JOURNAL_PROFILE"
+PROFILES_DIR = os.path.join(os.getcwd(), "profiles")
+
+# Only the newest profiles are kept, up to this many and this many bytes in total
+MAX_PROFILES = 50
+MAX_PROFILES_BYTES = 50 * 2 ** 20
+
+# Seconds between stack samples, and rows in the hotspot table
+SAMPLE_INTERVAL = 0.005
+HOTSPOT_ROWS = 25
+# Profiles of this session linked from the sidebar
+RECENT_PROFILES = 10
+
+PROFILE_NAME = re.compile(r"^[\w.-]+\.folded$")
+
+_prune_lock = threading.Lock()
+
+
+def profiling_enabled():
+    if os.environ.get(PROFILE_ENV) == "1":
+        return True
+    return st.session_state.get("logged_in", False) and st.query_params.get("profile") == "1"
+
+
+# Delete the oldest profiles beyond MAX_PROFILES or MAX_PROFILES_BYTES
+def prune_profiles(directory=PROFILES_DIR):
+    with _prune_lock:
+        profiles = []
+        for entry in os.scandir(directory):
+            if PROFILE_NAME.match(entry.name) and entry.is_file():
+                stat = entry.stat()
+                profiles.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        profiles.sort(reverse=True)
+
+        kept_bytes = 0
+        for kept, (mtime, size, path) in enumerate(profiles):
+            kept_bytes += size
+            if kept >= MAX_PROFILES or kept_bytes > MAX_PROFILES_BYTES:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+# Samples the stack of one script run until the page's module code is no longer on
+# it, i.e. the run finished, stopped or was interrupted by a rerun. Stacks are written
+# in the folded format (one "outer;...;inner count" line per distinct stack), which
+# flame graph tools such as speedscope read directly.
+class RunProfiler(threading.Thread):
+    def __init__(self, script_frame, path, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True, name="journal-profiler")
+        self.target = threading.get_ident()
+        # The run's own module frame: a later run of the same page gets a new one
+        self.script_frame = script_frame
+        self.path = path
+        self.interval = interval
+        self.samples = Counter()
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.target)
+        stack = []
+        in_script = False
+        while frame is not None:
+            stack.append(_frame_label(frame.f_code))
+            in_script = in_script or frame is self.script_frame
+            frame = frame.f_back
+        if not in_script:
+            self.script_frame = None
+            return False
+        self.samples[";".join(reversed(stack))] += 1
+        return True
+
+    def run(self):
+        while self._sample():
+            time.sleep(self.interval)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as profile:
+            for stack, count in self.samples.items():
+                profile.write(f"{stack} {count}\n")
+        prune_profiles(os.path.dirname(self.path))
+
+
+# Start profiling the script run that called make_sidebar; the profile is named by
+# page and start time and listed in the sidebar once the run has finished
+def start_profile(page):
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_name != "<module>":
+        frame = frame.f_back
+    if frame is None:
+        return None
+
+    name = f"{page}-{datetime.now():%Y%m%d-%H%M%S-%f}.folded"
+    RunProfiler(frame, os.path.join(PROFILES_DIR, name)).start()
+    recent = st.session_state.setdefault("profiles", [])
+    recent.append(name)
+    del recent[:-RECENT_PROFILES]
+    return name
+
+
+def profile_path(name):
+    if not name or not PROFILE_NAME.match(name):
+        return None
+    path = os.path.join(PROFILES_DIR, name)
+    return path if os.path.exists(path) else None
+
+
+# Functions with the most samples at the top of the stack (Self) and anywhere on it
+# (Total), as a share of all samples and estimated milliseconds
+def hotspots(path, limit=HOTSPOT_ROWS, interval=SAMPLE_INTERVAL):
+    self_samples = Counter()
+    total_samples = Counter()
+    samples = 0
+    with open(path) as profile:
+        for line in profile:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            count = int(count)
+            frames = stack.split(";")
+            samples += count
+            self_samples[frames[-1]] += count
+            for function in set(frames):
+                total_samples[function] += count
+
+    if not samples:
+        return pd.DataFrame(columns=["Function", "Self %", "Total %", "Self ms", "Total ms"])
+    rows = [{"Function": function, "Self %": count / samples * 100,
+             "Total %": total_samples[function] / samples * 100,
+             "Self ms": count * interval * 1000,
+             "Total ms": total_samples[function] * interval * 1000}
+            for function, count in self_samples.most_common(limit)]
+    return pd.DataFrame(rows, columns=["Function", "Self %", "Total %", "Self ms", "Total ms"])
+
+
+# The profile to show is kept in the URL (?view_profile=...), so the table can be
+# reopened or shared while the session lasts
+def open_profile(name):
+    st.query_params["view_profile"] = name
+
+
+def close_profile():
+    st.query_params.pop("view_profile", None)
+
+
+# Sidebar links to this session's finished profiles; each opens its hotspot table
+def render_profile_links():
+    finished = [name for name in st.session_state.get("profiles", []) if profile_path(name)]
+    with st.expander("Profiles"):
+        if not finished:
+            st.caption("No finished runs yet.")
+        for name in reversed(finished):
+            st.button(name.removesuffix(".folded"), key=f"open_profile_{name}",
+                      on_click=open_profile, args=(name,), use_container_width=True)
+
+
+# Hotspot table of the profile opened from the sidebar, shown above the page
+def render_hotspots(name):
+    path = profile_path(name)
+    if path is None:
+        st.warning(f"Profile {name} not found.")
+        return
+    with st.expander(f"Hotspots: {name.removesuffix('.folded')}", expanded=True):
+        st.button("Close", key="close_profile", on_click=close_profile)
+        st.dataframe(hotspots(path), hide_index=True, use_container_width=True,
+                     column_config={
+                         "Self %": st.column_config.NumberColumn(format="%.1f"),
+                         "Total %": st.column_config.NumberColumn(format="%.1f"),
+                         "Self ms": st.column_config.NumberColumn(format="%.0f"),
+                         "Total ms": st.column_config.NumberColumn(format="%.0f"),
+                     })
+        st.caption(f"Sampled every {SAMPLE_INTERVAL * 1000:.0f} ms. Full stacks: {path}")
@@ -0,0 +1,139 @@
+import pandas as pd
+import streamlit as st
+
+from timing import timed_function
+
+MONTHS = ["January", "February", "March", "April", "May", "June",
+          "July", "August", "September", "October", "November", "December"]
+
+# Rollups several pages and the login prefetch build from a tradelog. Each is cached
+# per tradelog version and shared between sessions; the leading underscore tells
+# Streamlit not to hash the frame. Callers must not modify what these return.
+
+# Total Net PnL and number of trades per calendar day
+@timed_function()
+@st.cache_resource(max_entries=32, show_spinner=False)
+def calculate_daily_summary(_tradelog, version):
+    tradelog = _tradelog
+    return tradelog.groupby(tradelog["Date"].dt.normalize()).agg(
+        pnl=("Net PnL", "sum"), trades=("Net PnL", "size"))
+
+
+# Top 3 and Bottom 3 setups by Net Profit, formatted for display
+@timed_function()
+@st.cache_resource(max_entries=32, show_spinner=False)
+def calculate_setup_tables(_tradelog, version):
+    tradelog = _tradelog
+    #### Aggregate Net Profit and Average Performance (%) by Setup ###
+    performance_summary = tradelog.groupby("Setup").agg(
+        Net_Profit=("Net PnL", "sum"),
+        Average_Performance=("Performance %", "mean")).reset_index()
+
+    # Sort to get Top 3 and Bottom 3 setups
+    top_3_setups = performance_summary.nlargest(3, 'Net_Profit')
+    bottom_3_setups = performance_summary.nsmallest(3, 'Net_Profit')
+
+    # Calculate Grand Total
+    grand_total = pd.DataFrame({
+        "Setup": ["Grand Total"],
+        "Net_Profit": [performance_summary["Net_Profit"].sum()],
+        "Average_Performance": [
+            performance_summary["Average_Performance"].mean()]})
+
+    # Format Top 3 Setups
+    top_3_formatted = pd.concat([top_3_setups, grand_total], ignore_index=True)
+
+    top_3_formatted['Net_Profit'] = top_3_formatted['Net_Profit'].apply(lambda x: f"${x:,.2f}")
+    top_3_formatted['Average_Performance'] = top_3_formatted['Average_Performance'].apply(lambda x: f"{x:.2f}%")
+    top_3_formatted.rename(columns={
+        "Net_Profit": "Net Profit",
+        "Average_Performance": "Avg Performance %"}, inplace=True)
+
+    # Format Bottom 3 Setups
+    bottom_3_formatted = pd.concat([bottom_3_setups, grand_total], ignore_index=True)
+    bottom_3_formatted['Net_Profit'] = bottom_3_formatted['Net_Profit'].apply(lambda x: f"${x:,.2f}")
+    bottom_3_formatted['Average_Performance'] = bottom_3_formatted['Average_Performance'].apply(
+        lambda x: f"{x:.2f}%")
+    bottom_3_formatted.rename(columns={
+        "Net_Profit": "Net Profit",
+        "Average_Performance": "Avg Performance %"}, inplace=True)
+
+    return top_3_formatted, bottom_3_formatted
+
+
+# Trades of `year` whose month falls between start_month and end_month (inclusive)
+@timed_function()
+@st.cache_resource(max_entries=64, show_spinner=False)
+def select_period_trades(_tradelog, version, year, start_month, end_month):
+    tradelog = _tradelog
+    return tradelog[(tradelog["Date"].dt.year == year) &
+                    (tradelog["Date"].dt.month >= start_month) &
+                    (tradelog["Date"].dt.month <= end_month)]
+
+
+# Calculate the statistics shown in a trading report
+@timed_function()
+@st.cache_resource(max_entries=64, show_spinner=False)
+def calculate_report_metrics(_filtered_trades, version, period_label):
+    filtered_trades = _filtered_trades
+
+    # Calculate each metric
+    volume = filtered_trades["Contracts"].sum()
+    total_fees = (filtered_trades["Total Broker Fees"] + filtered_trades["Risk Management Fee"]).sum()
+
+    # Directional statistics
+    long_trades = filtered_trades[filtered_trades["Direction"] == "Long"]
+    short_trades = filtered_trades[filtered_trades["Direction"] == "Short"]
+    long_PnL = long_trades["Net PnL"].sum()
+    short_PnL = short_trades["Net PnL"].sum()
+    monthly_netPnL = filtered_trades["Net PnL"].sum()
+
+    # Number of long and short trades
+    nr_long = long_trades.shape[0]
+    nr_short = short_trades.shape[0]
+    nr_trades = filtered_trades.shape[0]
+
+    # Winning and losing trades
+    winner_long = long_trades[long_trades["Net PnL"] > 0].shape[0]
+    winner_short = short_trades[short_trades["Net PnL"] > 0].shape[0]
+    looser_long = long_trades[long_trades["Net PnL"] < 0].shape[0]
+    looser_short = short_trades[short_trades["Net PnL"] < 0].shape[0]
+
+    # Gross profit and gross losses
+    gross_profit = filtered_trades[filtered_trades["PnL"] > 0]["PnL"].sum()
+    gross_losses = filtered_trades[filtered_trades["PnL"] < 0]["PnL"].sum()
+
+    # Win rate and risk/reward ratio
+    win_rate = (filtered_trades[filtered_trades["Net PnL"] > 0].shape[
+                    0] / nr_trades) * 100 if nr_trades > 0 else 0
+    risk_reward = (filtered_trades[filtered_trades["Net PnL"] < 0].shape[0] /
+                   filtered_trades[filtered_trades["Net PnL"] > 0].shape[0]) if \
+        filtered_trades[filtered_trades["Net PnL"] > 0].shape[0] > 0 else None
+
+    # Average winning and losing days
+    avg_winning_days = filtered_trades[filtered_trades["Net PnL"] > 0]["Net PnL"].mean()
+    avg_loosing_days = filtered_trades[filtered_trades["Net PnL"] < 0]["Net PnL"].mean()
+
+    return (volume, total_fees, long_PnL, short_PnL, monthly_netPnL, nr_long, nr_short,
+            nr_trades, winner_long, winner_short, looser_long, looser_short, gross_profit,
+            gross_losses, win_rate, risk_reward, avg_winning_days, avg_loosing_days)
+
+
+# Reporting opens on the month before the latest trade (December of the previous
+# year in January), as (year, month number)
+def default_report_month(latest_date):
+    if latest_date.month == 1:
+        return latest_date.year - 1, 12
+    return latest_date.year, latest_date.month - 1
+
+
+# The rollups a session sees first on each page: the calendar's daily summary, the
+# report of the default month and the dashboard's setup tables
+def build_common_rollups(tradelog, version):
+    calculate_daily_summary(tradelog, version)
+    if len(tradelog):
+        year, month = default_report_month(tradelog["Date"].max())
+        month_trades = select_period_trades(tradelog, version, year, month, month)
+        if not month_trades.empty:
+            calculate_report_metrics(month_trades, version, f"{MONTHS[month - 1]} {year}")
+    calculate_setup_tables(tradelog, version)
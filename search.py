@@ -0,0 +1,196 @@
+import math
+import re
+import sys
+import threading
+from collections import Counter, OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+# Free-text review of a trade
+NOTES_COLUMN = "Notes"
+
+# BM25 ranking parameters: term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Tradelog versions whose notes index is kept in memory across all sessions
+MAX_CACHED_INDEXES = 8
+
+# Session state key: the tradelog version the session last searched
+INDEXED_VERSION_KEY = "notes_index_version"
+
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from had has have i in is it its my of on or so
+that the then this to was were will with
+""".split())
+
+
+def tokenize(text):
+    if not isinstance(text, str):
+        return []
+    return [word for word in WORD.findall(text.lower()) if word not in STOP_WORDS]
+
+
+# Notes of each trade; a Trade ID that appears twice keeps its last notes
+def notes_by_trade(tradelog):
+    if NOTES_COLUMN not in tradelog.columns:
+        return {}
+    return dict(zip(tradelog["Trade ID"].to_numpy(),
+                    tradelog[NOTES_COLUMN].fillna("").astype(str).to_numpy()))
+
+
+# Inverted index over the Notes of one tradelog version. The note texts aren't kept
+# (the tradelog already holds them), only a hash per trade to spot edited notes and
+# each trade's terms so it can be removed again.
+class NotesIndex:
+    def __init__(self, tradelog=None):
+        self.postings = {}  # term -> {trade_id: term frequency}
+        self.lengths = {}  # trade_id -> number of indexed terms
+        self.terms = {}  # trade_id -> its distinct terms
+        self.digests = {}  # trade_id -> hash of its notes
+        self.total_length = 0
+        # Posting lists shared with the index this one was derived from
+        self._borrowed = set()
+        if tradelog is not None:
+            for trade_id, text in notes_by_trade(tradelog).items():
+                self.add(trade_id, text)
+
+    # Posting list of a term that this index may modify
+    def _own(self, term):
+        matches = self.postings.get(term)
+        if matches is None:
+            matches = self.postings[term] = {}
+        elif term in self._borrowed:
+            matches = self.postings[term] = dict(matches)
+            self._borrowed.discard(term)
+        return matches
+
+    def add(self, trade_id, text):
+        if trade_id in self.digests:
+            self.remove(trade_id)
+        self.digests[trade_id] = hash(text)
+        terms = Counter(sys.intern(term) for term in tokenize(text))
+        if not terms:
+            return
+        for term, frequency in terms.items():
+            self._own(term)[trade_id] = frequency
+        self.terms[trade_id] = tuple(terms)
+        length = sum(terms.values())
+        self.lengths[trade_id] = length
+        self.total_length += length
+
+    def remove(self, trade_id):
+        if self.digests.pop(trade_id, None) is None:
+            return
+        for term in self.terms.pop(trade_id, ()):
+            matches = self._own(term)
+            del matches[trade_id]
+            if not matches:
+                del self.postings[term]
+                self._borrowed.discard(term)
+        self.total_length -= self.lengths.pop(trade_id, 0)
+
+    # Index of another version of the tradelog, derived from this one: only trades
+    # whose notes were added, edited or deleted are re-indexed. This index is left
+    # unchanged, so sessions still searching it aren't affected.
+    def updated(self, tradelog):
+        notes = notes_by_trade(tradelog)
+        index = NotesIndex()
+        index.postings = dict(self.postings)
+        index.lengths = dict(self.lengths)
+        index.terms = dict(self.terms)
+        index.digests = dict(self.digests)
+        index.total_length = self.total_length
+        index._borrowed = set(self.postings)
+        for trade_id in self.digests.keys() - notes.keys():
+            index.remove(trade_id)
+        for trade_id, text in notes.items():
+            if self.digests.get(trade_id) != hash(text):
+                index.add(trade_id, text)
+        return index
+
+    # Trade IDs ranked by BM25 relevance to the query, best first
+    def search(self, query, limit=50):
+        documents = len(self.lengths)
+        if not documents:
+            return []
+        average_length = self.total_length / documents
+
+        scores = Counter()
+        for term in set(tokenize(query)):
+            matches = self.postings.get(term)
+            if not matches:
+                continue
+            idf = math.log(1 + (documents - len(matches) + 0.5) / (len(matches) + 0.5))
+            for trade_id, frequency in matches.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[trade_id] / average_length)
+                scores[trade_id] += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return scores.most_common(limit)
+
+
+# Notes indexes of recent tradelog versions, shared between sessions. An edit gives
+# the session's tradelog a new version; its index is derived from the index of the
+# version the session searched before, which is then dropped. Any other missing
+# version is derived from the most recently used index, since sessions' logs differ
+# by a few edits at most.
+class NotesIndexCache:
+    def __init__(self, max_entries=MAX_CACHED_INDEXES):
+        self.max_entries = max_entries
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tradelog, version, previous=None):
+        with self._lock:
+            index = self._indexes.get(version)
+            if index is not None:
+                self._indexes.move_to_end(version)
+                return index
+            if previous in self._indexes:
+                base_version = previous
+            else:
+                base_version = next(reversed(self._indexes), None)
+            base = self._indexes.get(base_version)
+
+        # Build outside the lock so a large log doesn't block other sessions
+        index = NotesIndex(tradelog) if base is None else base.updated(tradelog)
+
+        with self._lock:
+            if previous is not None and base_version == previous:
+                self._indexes.pop(previous, None)
+            self._indexes[version] = index
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index
+
+    def __contains__(self, version):
+        return version in self._indexes
+
+    def __len__(self):
+        return len(self._indexes)
+
+
+# One cache per server process, shared by every session
+@st.cache_resource
+def get_notes_indexes():
+    return NotesIndexCache()
+
+
+# Notes index of a tradelog version (`previous`: a version whose index may be updated
+# instead of building a new one)
+def get_notes_index(tradelog, version, previous=None):
+    return get_notes_indexes().get(tradelog, version, previous)
+
+
+# Trades whose notes match the query, most relevant first, with their score
+def search_notes(tradelog, version, query, limit=50):
+    previous = st.session_state.get(INDEXED_VERSION_KEY)
+    ranked = get_notes_index(tradelog, version, previous).search(query, limit)
+    st.session_state[INDEXED_VERSION_KEY] = version
+    if not ranked:
+        return tradelog.head(0).assign(Score=pd.Series(dtype=float))
+    scores = pd.Series(dict(ranked), name="Score")
+    matches = tradelog[tradelog["Trade ID"].isin(scores.index)]
+    matches = matches.assign(Score=matches["Trade ID"].map(scores).to_numpy())
+    return matches.sort_values("Score", ascending=False)
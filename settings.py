@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from metrics import LOADER_REQUESTS, LOADER_MISSES
+
+# Settings are kept in the project directory so every page and session sees the same values
+SETTINGS_PATH = os.path.join(os.getcwd(), "settings.json")
+
+DEFAULT_TICKER_DATA = {
+    "Ticker": ["ES", "MES", "YM", "MYM", "GC", "MGC", "CL", "MCL",
+               "NQ", "MNQ"],
+    "Tick Size": [0.25, 0.25, 1, 1, 0.1, 0.1, 0.01, 0.01, 0.25,
+                  0.25],
+    "Ticks per 1 point": [4, 4, 1, 1, 10, 10, 100, 100, 4, 4],
+    "Equals 1 point": [1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+    "Tick Dollar Value": [12.5, 1.25, 5, 0.5, 10, 1, 10, 1, 5,
+                          0.5],
+    "Point Dollar Value": [50, 5, 5, 0.5, 100, 10, 1000, 100, 20,
+                           2],
+    "Currency": ["USD"] * 10,
+    "Broker Fees": [3] * 10
+}
+
+DEFAULT_SETTINGS = {
+    "initial_balance": 50000.0,
+    "risk_management_fee": 2.0,
+    "ticker_data": DEFAULT_TICKER_DATA,
+}
+
+_settings_lock = threading.Lock()
+
+
+# Same settings give the same version, in every session and across restarts
+def settings_version(settings):
+    encoded = json.dumps(settings, sort_keys=True, default=str).encode()
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+# The ticker table as plain JSON lists, in the shape the table editor returns it, so
+# an unedited table compares equal to the stored one
+def _canonical_ticker_data(ticker_data):
+    return json.loads(json.dumps(pd.DataFrame(ticker_data).to_dict(orient="list"), default=str))
+
+
+def _file_key(path=SETTINGS_PATH):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+# Settings read from disk once per file change and shared between sessions; keys
+# missing from the file fall back to the defaults
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_settings(file_key, path=SETTINGS_PATH):
+    LOADER_MISSES.inc(loader="settings")
+    settings = json.loads(json.dumps(DEFAULT_SETTINGS))
+    if file_key is not None:
+        try:
+            with open(path) as settings_file:
+                stored = json.load(settings_file)
+            settings.update({key: stored[key] for key in DEFAULT_SETTINGS if key in stored})
+        except (OSError, ValueError):
+            pass  # Unreadable file: keep the defaults
+    settings["ticker_data"] = _canonical_ticker_data(settings["ticker_data"])
+    return settings, settings_version(settings), pd.DataFrame(settings["ticker_data"])
+
+
+# Current settings; shared between sessions, so callers must not modify them
+def get_settings():
+    LOADER_REQUESTS.inc(loader="settings")
+    return _load_settings(_file_key())[0]
+
+
+def get_settings_version():
+    return _load_settings(_file_key())[1]
+
+
+# Ticker table from the settings as a DataFrame (shared; do not modify)
+def get_ticker_data():
+    return _load_settings(_file_key())[2]
+
+
+# Write new settings if they differ from the stored ones. The file is replaced in one
+# step so readers never see half of it. Returns True if anything changed.
+def save_settings(initial_balance, risk_management_fee, ticker_data):
+    settings = {
+        "initial_balance": float(initial_balance),
+        "risk_management_fee": float(risk_management_fee),
+        "ticker_data": _canonical_ticker_data(ticker_data),
+    }
+    if settings_version(settings) == get_settings_version():
+        return False
+
+    with _settings_lock:
+        temporary_path = f"{SETTINGS_PATH}.tmp"
+        with open(temporary_path, "w") as settings_file:
+            json.dump(settings, settings_file, indent=2)
+        os.replace(temporary_path, SETTINGS_PATH)
+    return True
@@ -0,0 +1,160 @@
+import re
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from bitmaps import all_rows, no_rows, from_positions, positions, invert, count
+
+# Free-form labels per trade, stored comma separated, e.g. "news day, scaled in"
+TAGS_COLUMN = "Tags"
+TAG_SEPARATOR = ","
+
+# Tag query tokens: parentheses, quoted tags, operators, or words of a tag name
+QUERY_TOKEN = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([&|!])|([^\s()"&|!]+))')
+OPERATORS = {"AND": "&", "OR": "|", "NOT": "!"}
+
+
+# Tags are compared case-insensitively and without surrounding spaces
+def normalize_tag(tag):
+    return " ".join(str(tag).split()).lower()
+
+
+def parse_tags(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return []
+    tags = (normalize_tag(tag) for tag in str(value).split(TAG_SEPARATOR))
+    return list(dict.fromkeys(tag for tag in tags if tag))
+
+
+def format_tags(tags):
+    return f"{TAG_SEPARATOR} ".join(tags)
+
+
+# One bitmap per tag over one tradelog version
+class TagIndex:
+    def __init__(self, tradelog):
+        self.n = len(tradelog)
+        self.bitmaps = {}
+        if TAGS_COLUMN not in tradelog.columns:
+            return
+
+        per_row = tradelog[TAGS_COLUMN].map(parse_tags).reset_index(drop=True).explode()
+        per_row = per_row[per_row.notna()]
+        for tag, rows in per_row.groupby(per_row, sort=True).groups.items():
+            self.bitmaps[tag] = from_positions(np.asarray(rows), self.n)
+
+    def tags(self):
+        return list(self.bitmaps)
+
+    def tag(self, name):
+        return self.bitmaps.get(normalize_tag(name), no_rows(self.n))
+
+    # Bitmap of the rows matching a tag query such as
+    #   news day AND (scaled in OR "a+ setup") AND NOT revenge
+    # &, | and ! work as AND, OR and NOT; words not separated by an operator form one tag
+    def query(self, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return all_rows(self.n)
+        bitmap, end = self._parse_or(tokens, 0)
+        if end != len(tokens):
+            raise ValueError(f"Unexpected '{tokens[end][1]}' in tag query")
+        return bitmap
+
+    def _parse_or(self, tokens, i):
+        bitmap, i = self._parse_and(tokens, i)
+        while i < len(tokens) and tokens[i] == ("op", "|"):
+            right, i = self._parse_and(tokens, i + 1)
+            bitmap = bitmap | right
+        return bitmap, i
+
+    def _parse_and(self, tokens, i):
+        bitmap, i = self._parse_not(tokens, i)
+        while i < len(tokens) and tokens[i] == ("op", "&"):
+            right, i = self._parse_not(tokens, i + 1)
+            bitmap = bitmap & right
+        return bitmap, i
+
+    def _parse_not(self, tokens, i):
+        if i < len(tokens) and tokens[i] == ("op", "!"):
+            bitmap, i = self._parse_not(tokens, i + 1)
+            return invert(bitmap, self.n), i
+        return self._parse_atom(tokens, i)
+
+    def _parse_atom(self, tokens, i):
+        if i >= len(tokens):
+            raise ValueError("Tag query ends unexpectedly")
+        kind, value = tokens[i]
+        if kind == "tag":
+            return self.tag(value), i + 1
+        if kind == "(":
+            bitmap, i = self._parse_or(tokens, i + 1)
+            if i >= len(tokens) or tokens[i][0] != ")":
+                raise ValueError("Missing ')' in tag query")
+            return bitmap, i + 1
+        raise ValueError(f"Unexpected '{value}' in tag query")
+
+
+# Split a tag query into ("(", "("), (")", ")"), ("op", "&" | "|" | "!") and ("tag", name)
+# tokens; consecutive plain words are joined into one tag name
+def tokenize(text):
+    tokens = []
+    words = []
+
+    def flush():
+        if words:
+            tokens.append(("tag", " ".join(words)))
+            words.clear()
+
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = QUERY_TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"Cannot read tag query near '{text[position:]}'")
+        position = match.end()
+        opening, closing, quoted, symbol, word = match.groups()
+        if word is not None and word.upper() not in OPERATORS:
+            words.append(word)
+            continue
+        flush()
+        if opening:
+            tokens.append(("(", "("))
+        elif closing:
+            tokens.append((")", ")"))
+        elif quoted is not None:
+            tokens.append(("tag", quoted))
+        elif symbol:
+            tokens.append(("op", symbol))
+        else:
+            tokens.append(("op", OPERATORS[word.upper()]))
+    flush()
+    return tokens
+
+
+# Index for a tradelog version, built once and shared between sessions
+# (the underscore keeps the frame unhashed)
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_tag_index(_tradelog, version):
+    return TagIndex(_tradelog)
+
+
+# Trades, win rate and Net PnL per tag, read from the tag bitmaps
+@st.cache_resource(max_entries=8, show_spinner=False)
+def calculate_tag_statistics(_tradelog, version):
+    index = get_tag_index(_tradelog, version)
+    net_pnl = pd.to_numeric(_tradelog["Net PnL"], errors="coerce").to_numpy(dtype=float)
+
+    rows = []
+    for tag, bitmap in index.bitmaps.items():
+        pnl = net_pnl[positions(bitmap, index.n)]
+        closed = pnl[~np.isnan(pnl)]
+        rows.append({
+            "Tag": tag,
+            "Trades": count(bitmap),
+            "Win Rate": (closed > 0).mean() * 100 if len(closed) else np.nan,
+            "Net PnL": closed.sum(),
+            "Avg Net PnL": closed.mean() if len(closed) else np.nan,
+        })
+    return pd.DataFrame(rows, columns=["Tag", "Trades", "Win Rate", "Net PnL", "Avg Net PnL"])
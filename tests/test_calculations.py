@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench.synthetic import generate_tradelog
+from calculations import (apply_fee_schedule, open_trades, recalculate_rows,
+                          recalculate_trades, trade_base)
+from settings import DEFAULT_SETTINGS
+
+# Tick and cent arithmetic of the trade calculations, against the float formulas
+TICKER_DATA = DEFAULT_SETTINGS["ticker_data"]
+RISK_FEE = 2.0
+INITIAL_BALANCE = 50_000.0
+
+
+@pytest.fixture(scope="module")
+def tradelog():
+    return generate_tradelog(2_000, seed=2, open_positions=0.05)
+
+
+def ticker_column(tradelog, column):
+    values = dict(zip(TICKER_DATA["Ticker"], TICKER_DATA[column]))
+    return tradelog["Ticker"].astype(str).map(values).to_numpy(dtype=float)
+
+
+def test_pnl_matches_the_float_formula(tradelog):
+    base = trade_base(tradelog, TICKER_DATA)
+    sign = np.where(tradelog["Direction"].astype(str) == "Long", 1, -1)
+    points = sign * (tradelog["Exit Price"] - tradelog["Entry Price"]).to_numpy()
+    pnl = points * tradelog["Contracts"].to_numpy() * ticker_column(tradelog, "Point Dollar Value")
+
+    closed = ~np.isnan(pnl)
+    assert (base["closed"] == closed).all()
+    assert (base["pnl_cents"][~closed] == 0).all()
+    np.testing.assert_allclose(base["pnl_cents"][closed] / 100, pnl[closed], atol=0.005)
+
+
+def test_fee_schedule_matches_the_float_formula(tradelog):
+    columns = apply_fee_schedule(trade_base(tradelog, TICKER_DATA), RISK_FEE, INITIAL_BALANCE)
+    contracts = tradelog["Contracts"].to_numpy()
+    risk_fee = RISK_FEE / 100 * tradelog["Entry Price"].to_numpy() * contracts
+    broker_fees = ticker_column(tradelog, "Broker Fees") * contracts
+
+    closed = tradelog["Exit Price"].notna().to_numpy()
+    np.testing.assert_allclose(columns["Risk Management Fee"][closed], risk_fee[closed], atol=0.005)
+    np.testing.assert_allclose(columns["Total Broker Fees"][closed], broker_fees[closed])
+    np.testing.assert_allclose(columns["Net PnL"][closed],
+                               columns["PnL"][closed] - risk_fee[closed] - broker_fees[closed],
+                               atol=0.01)
+    assert np.isnan(columns["Net PnL"][~closed]).all()
+
+    # The running balance is the exact cent sum of the Net PnL
+    net_pnl = np.nan_to_num(columns["Net PnL"])
+    np.testing.assert_allclose(columns["Cumulative Performance"],
+                               INITIAL_BALANCE + np.cumsum(net_pnl), atol=1e-6)
+
+
+def test_prices_between_ticks_stay_exact():
+    tradelog = pd.DataFrame({"Ticker": ["ES", "CL"], "Direction": ["Long", "Short"],
+                             "Contracts": [3, 1], "Entry Price": [4500.10, 71.237],
+                             "Exit Price": [4501.35, 70.001]})
+    base = trade_base(tradelog, TICKER_DATA)
+    assert base["pnl_cents"].tolist() == [125 * 3 * 50, 123_600]
+
+
+def test_open_means_no_exit_price():
+    tradelog = pd.DataFrame({"Exit Price": [101.0, np.nan, 99.5],
+                             "Exit Time": [None, "10:30 AM", None]})
+    assert open_trades(tradelog).tolist() == [False, True, False]
+
+
+def test_recalculating_edited_rows_matches_a_full_recalculation(tradelog):
+    edited = recalculate_trades(tradelog, RISK_FEE, TICKER_DATA, INITIAL_BALANCE)
+    edited.loc[[40, 900], "Exit Price"] += 2.5
+    edited.loc[1500, "Contracts"] = 7
+
+    partial = recalculate_rows(edited, [40, 900, 1500], RISK_FEE, TICKER_DATA, INITIAL_BALANCE)
+    full = recalculate_trades(edited, RISK_FEE, TICKER_DATA, INITIAL_BALANCE)
+    for column in ["Net PnL", "Cumulative Performance", "Performance %", "20 MA", "Return %"]:
+        np.testing.assert_allclose(partial[column], full[column], equal_nan=True)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cashflows import cash_flow_adjusted_equity, max_drawdown_pct
+
+# Flow-adjusted balance and time-weighted return on a hand-computed ledger
+
+
+def ledger(rows):
+    frame = pd.DataFrame(rows, columns=["Date", "Flow"])
+    frame["Date"] = pd.to_datetime(frame["Date"])
+    frame["Flow"] = frame["Flow"].astype(float)
+    return frame
+
+
+TRADES = pd.DataFrame({
+    "Date": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"]),
+    "Net PnL": [100.0, -50.0, 200.0, 55.0],
+    "Cumulative Performance": [1100.0, 1050.0, 1250.0, 1305.0],
+})
+
+
+def test_balance_and_twr_with_a_withdrawal_and_a_deposit():
+    # 500 out before the second trade, 250 in before the fourth
+    equity = cash_flow_adjusted_equity(
+        TRADES, ledger([("2024-01-02", -500.0), ("2024-01-04", 250.0)]))
+
+    assert equity["Balance"].tolist() == [1100.0, 550.0, 750.0, 1055.0]
+    # Returns on the balance each trade started from, after the flows before it
+    returns = [100 / 1000, -50 / 600, 200 / 550, 55 / 1000]
+    np.testing.assert_allclose(equity["Performance %"], np.array(returns) * 100)
+    assert equity["TWR"].iloc[-1] == pytest.approx(np.prod(1 + np.array(returns)) - 1)
+    # The withdrawal is not a drawdown; the losing trade after it is
+    assert equity["Drawdown %"].min() == pytest.approx(-50 / 600 * 100)
+
+
+def test_without_flows_twr_is_the_trading_return():
+    equity = cash_flow_adjusted_equity(TRADES, ledger([]))
+    assert equity["Balance"].tolist() == TRADES["Cumulative Performance"].tolist()
+    assert equity["TWR"].iloc[-1] == pytest.approx(1305 / 1000 - 1)
+
+
+def test_flows_after_the_last_trade_are_not_attached():
+    equity = cash_flow_adjusted_equity(TRADES, ledger([("2024-02-01", -300.0)]))
+    assert (equity["Cumulative Flow"] == 0).all()
+
+
+def test_max_drawdown_pct():
+    assert max_drawdown_pct([100, 120, 90, 130, 117]) == pytest.approx(-25.0)
+    assert max_drawdown_pct([]) == 0.0
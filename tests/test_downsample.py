@@ -0,0 +1,45 @@
+import numpy as np
+
+from downsample import downsample_indices, extreme_indices, lttb_indices
+
+# Point reduction of long equity curves
+
+
+def random_walk(n, seed=0):
+    return np.cumsum(np.random.default_rng(seed).normal(size=n)) + 1000
+
+
+def test_short_series_are_kept_whole():
+    assert downsample_indices(random_walk(50), budget=100).tolist() == list(range(50))
+
+
+def test_lttb_keeps_endpoints_and_returns_the_threshold():
+    y = random_walk(10_000)
+    selected = lttb_indices(np.arange(len(y)), y, 500)
+    assert len(selected) == 500
+    assert selected[0] == 0 and selected[-1] == len(y) - 1
+    assert (np.diff(selected) > 0).all()
+
+
+def test_lttb_keeps_a_lone_spike():
+    y = np.zeros(1000)
+    y[437] = 50
+    assert 437 in lttb_indices(np.arange(len(y)), y, 50)
+
+
+def test_extremes_are_the_high_low_and_deepest_drawdown():
+    y = np.array([5, 7, 6, 9, 3, 4, 8, 2, 6], dtype=float)
+    # High 9 at 3; the deepest fall is from 9 (3) to 2 (7), which is also the low
+    assert extreme_indices(y).tolist() == [3, 7]
+
+    # Low 0.5 at 6 after the peak 13 at 5; the high 20 comes last
+    y = np.array([1, 10, 4, 12, 11, 13, 0.5, 20], dtype=float)
+    assert extreme_indices(y).tolist() == [5, 6, 7]
+
+
+def test_downsampling_keeps_the_drawdown_extremes():
+    y = random_walk(20_000, seed=3)
+    selected = downsample_indices(y, budget=400)
+    assert len(selected) <= 404
+    assert set(extreme_indices(y)) <= set(selected)
+    assert y[selected].max() == y.max() and y[selected].min() == y.min()
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench.synthetic import generate_tradelog
+from bitmaps import positions
+from filters import TradeIndex
+
+# The bitmap filters return the same rows as a pandas mask over the log
+
+
+@pytest.fixture(scope="module")
+def tradelog():
+    return generate_tradelog(2_000, seed=1, open_positions=0.05)
+
+
+@pytest.mark.parametrize("criteria", [
+    {},
+    {"date_range": ("2015-03-02", "2015-06-30")},
+    {"pnl_min": -50.0, "pnl_max": 120.0},
+    {"pnl_min": 0.0},
+    {"Ticker": [" es", "NQ"], "Direction": ["Short"]},
+    {"Setup": ["Zone", "Sniper"], "Emotion": ["Fear"], "pnl_max": 0.0},
+    {"Order State": ["Open"]},
+    {"Order State": ["Closed"], "trade_id": 17},
+])
+def test_match_equals_pandas_mask(tradelog, criteria):
+    mask = pd.Series(True, index=tradelog.index)
+    if "date_range" in criteria:
+        start, end = pd.to_datetime(criteria["date_range"])
+        mask &= tradelog["Date"].between(start, end)
+    if "pnl_min" in criteria:
+        mask &= tradelog["Net PnL"] >= criteria["pnl_min"]
+    if "pnl_max" in criteria:
+        mask &= tradelog["Net PnL"] <= criteria["pnl_max"]
+    if "trade_id" in criteria:
+        mask &= tradelog["Trade ID"] == criteria["trade_id"]
+    if "Ticker" in criteria:
+        mask &= tradelog["Ticker"].isin([ticker.strip().upper() for ticker in criteria["Ticker"]])
+    for column in ["Direction", "Setup", "Emotion"]:
+        if column in criteria:
+            mask &= tradelog[column].isin(criteria[column])
+    if "Order State" in criteria:
+        is_open = tradelog["Exit Price"].isna()
+        mask &= is_open if criteria["Order State"] == ["Open"] else ~is_open
+
+    index = TradeIndex(tradelog)
+    assert positions(index.match(criteria), index.n).tolist() == np.flatnonzero(mask).tolist()
@@ -0,0 +1,93 @@
+import gc
+import os
+import time
+import weakref
+
+import plotly.graph_objects as go
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import memory
+import navigation
+import prewarm
+import trade_store
+from bench.synthetic import generate_tradelog, write_tradelog
+
+# Idle eviction, checked headless with AppTest against a small synthetic log
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_TIMEOUT = 300
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Plotly imports IPython on first serialization, and IPython holds on to the
+    # __main__ module of whichever page run imported it (prewarm does this at startup)
+    go.Figure().to_json()
+    path = tmp_path / "tradelog.csv"
+    write_tradelog(generate_tradelog(500, seed=0, open_positions=0.05), path)
+    monkeypatch.setenv(prewarm.PREWARM_ENV, "0")
+    monkeypatch.setenv(trade_store.TRADELOG_SOURCE_ENV, str(path))
+    monkeypatch.setattr(trade_store, "file_path", str(tmp_path / "tradelog_updated.csv"))
+    monkeypatch.setattr(trade_store, "SPILL_DIR", str(tmp_path / "session_spill"))
+    app = AppTest.from_file(os.path.join(REPO_DIR, "Journal_app.py"),
+                            default_timeout=APP_TIMEOUT)
+    app.session_state["logged_in"] = True
+    return app
+
+
+# Whether the weakly referenced object is garbage collected within the timeout. The
+# finished run's script thread and spinner timers can hold on to its frames briefly.
+def collected(ref, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        gc.collect()
+        if ref() is None or time.monotonic() > deadline:
+            return ref() is None
+        time.sleep(0.05)
+
+
+def run(app):
+    app.run()
+    assert not app.exception, app.exception[0].value
+    return app
+
+
+# Once released, nothing the page's earlier runs registered (fragments, widget
+# callbacks, the script's globals) may keep the frame alive
+@pytest.mark.parametrize("page", ["Journal", "Calendar", "Dashboard", "Reporting"])
+def test_idle_session_tradelog_is_collected(app, page, monkeypatch):
+    run(app)
+    app.switch_page(f"pages/{page}.py")
+    run(app)
+    tradelog = weakref.ref(app.session_state["tradelog"])
+
+    # The user stops interacting and the sweeper marks the session idle; the release
+    # happens on the session's next run of release_when_idle
+    monkeypatch.setattr(navigation, "track_session", lambda: None)
+    registry = memory.get_session_registry()
+    monkeypatch.setattr(registry, "idle_seconds", 1e-9)
+    evictions = registry.evictions
+    registry.mark_idle()
+    run(app)
+
+    assert registry.evictions == evictions + 1
+    assert "tradelog" not in app.session_state
+    assert collected(tradelog)
+
+    # The session waits on the main page; resuming goes back and reloads the tradelog
+    next(button for button in app.button if button.label == "Resume").click()
+    run(app)
+    assert memory.RELEASED_KEY not in app.session_state
+    assert app.session_state["tradelog"] is not None
+
+
+# A fragment rerun the user triggered keeps the session active; a timer's doesn't
+def test_only_untimed_fragments_count_as_activity(monkeypatch):
+    touched = []
+    monkeypatch.setattr(memory, "track_session", lambda: touched.append(True))
+    monkeypatch.setattr(memory.st, "fragment", lambda function, run_every=None: function)
+
+    memory.tracked_fragment(run_every=5)(lambda: None)()
+    assert touched == []
+    memory.tracked_fragment(lambda: None)()
+    assert touched == [True]
@@ -0,0 +1,22 @@
+import pytest
+
+from metrics import METRICS_PORT_ENV, metrics_port
+
+
+# A bad JOURNAL_METRICS_PORT turns the endpoint off instead of failing every page
+@pytest.mark.parametrize("value, port", [
+    ("9464", 9464),
+    (" 9464 ", 9464),
+    ("", None),
+    ("metrics", None),
+    ("0", None),
+    ("70000", None),
+])
+def test_metrics_port(value, port, monkeypatch):
+    monkeypatch.setenv(METRICS_PORT_ENV, value)
+    assert metrics_port() == port
+
+
+def test_metrics_port_unset(monkeypatch):
+    monkeypatch.delenv(METRICS_PORT_ENV, raising=False)
+    assert metrics_port() is None
@@ -0,0 +1,212 @@
+import os
+import time
+import tracemalloc
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from bench.synthetic import generate_tradelog, write_tradelog
+
+# Page latency budgets, checked headless with AppTest against a synthetic log.
+# Run with: python -m pytest tests/test_page_latency.py
+#   JOURNAL_TEST_TRADES   fixture size (default 10000)
+#   JOURNAL_BUDGET_SCALE  multiplies every budget, e.g. 2 on a slow machine
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRADES = int(os.environ.get("JOURNAL_TEST_TRADES", 10_000))
+BUDGET_SCALE = float(os.environ.get("JOURNAL_BUDGET_SCALE", 1.0))
+APP_TIMEOUT = 300
+
+# Seconds and MB (peak traced allocation) allowed for one rerun at the default size
+BUDGETS = {
+    "login": (3.0, 30),
+    "journal_rerun": (1.5, 20),
+    "journal_add_trade": (3.0, 30),
+    "journal_grid_page": (1.5, 20),
+    "journal_notes_search": (2.0, 20),
+    "calendar_visit": (0.5, 10),
+    "calendar_month": (0.3, 5),
+    "dashboard_visit": (1.5, 20),
+    "dashboard_performance": (1.5, 20),
+    "dashboard_analytics": (1.0, 20),
+    "dashboard_evaluation": (1.0, 20),
+    "reporting_visit": (0.5, 10),
+    "reporting_quarterly": (0.5, 10),
+    "reporting_annual": (0.5, 10),
+    "reporting_month": (0.5, 10),
+}
+
+
+@pytest.fixture(scope="module")
+def fixture_log(tmp_path_factory):
+    path = tmp_path_factory.mktemp("tradelog") / f"tradelog_{TRADES}.csv"
+    write_tradelog(generate_tradelog(TRADES, seed=0, open_positions=0.01), path)
+    return str(path)
+
+
+# The app loads the fixture instead of the GitHub log, and saves to a scratch file.
+# Budgets are for cold caches, so the background warm-up stays off.
+@pytest.fixture(autouse=True)
+def app_environment(fixture_log, tmp_path, monkeypatch):
+    import prewarm
+    import trade_store
+    monkeypatch.setenv(prewarm.PREWARM_ENV, "0")
+    monkeypatch.setenv(trade_store.TRADELOG_SOURCE_ENV, fixture_log)
+    monkeypatch.setattr(trade_store, "file_path", str(tmp_path / "tradelog_updated.csv"))
+
+
+def clear_caches():
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+
+def run(app):
+    app.run()
+    assert not app.exception, app.exception[0].value
+    return app
+
+
+def login_page():
+    return run(AppTest.from_file(os.path.join(REPO_DIR, "Journal_app.py"),
+                                 default_timeout=APP_TIMEOUT))
+
+
+def submit_login(app):
+    app.text_input[0].input("admin")
+    app.text_input[1].input("admin")
+    app.button[0].click()
+
+
+# Logged in through the login form and showing the given page. AppTest keeps the
+# login form's inputs in its element tree after st.switch_page, which breaks the next
+# rerun, so the logged-in session carries on in a fresh AppTest of the app.
+SESSION_KEYS = ["logged_in", "tradelog", "tradelog_version"]
+
+
+def open_page(page):
+    def prepare():
+        login = login_page()
+        submit_login(login)
+        run(login)
+        app = AppTest.from_file(os.path.join(REPO_DIR, "Journal_app.py"),
+                                default_timeout=APP_TIMEOUT)
+        for key in SESSION_KEYS:
+            app.session_state[key] = login.session_state[key]
+        app.switch_page(f"pages/{page}.py")
+        return run(app)
+    return prepare
+
+
+def visit(page):
+    return lambda app: app.switch_page(f"pages/{page}.py")
+
+
+def selectbox(label, value):
+    def interact(app):
+        next(box for box in app.selectbox if box.label == label).set_value(value)
+    return interact
+
+
+def dashboard_panel(panel):
+    return lambda app: app.radio(key="dashboard_panel").set_value(panel)
+
+
+def add_trade(app):
+    app.number_input[0].set_value(20.0)
+    app.number_input[1].set_value(21.5)
+    next(button for button in app.button if button.label == "Add Trade").click()
+
+
+def previous_month(app):
+    month = next(box for box in app.selectbox if box.label == "Month")
+    options = month.options
+    month.set_value(options[(options.index(month.value) - 1) % len(options)])
+
+
+# Rerun time and traced peak memory after an interaction. The app is prepared twice
+# from cold caches: once for the timed rerun, once for the rerun under tracemalloc,
+# so tracing doesn't slow the timed one.
+def measure_rerun(prepare, interact):
+    clear_caches()
+    app = prepare()
+    interact(app)
+    start = time.perf_counter()
+    run(app)
+    seconds = time.perf_counter() - start
+
+    clear_caches()
+    app = prepare()
+    interact(app)
+    tracemalloc.start()
+    try:
+        run(app)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+    return app, seconds, peak_mb
+
+
+def check_budget(name, prepare, interact):
+    app, seconds, peak_mb = measure_rerun(prepare, interact)
+    max_seconds, max_mb = BUDGETS[name]
+    assert seconds <= max_seconds * BUDGET_SCALE, \
+        f"{name} took {seconds:.2f}s, budget {max_seconds * BUDGET_SCALE:.2f}s"
+    assert peak_mb <= max_mb * BUDGET_SCALE, \
+        f"{name} peaked at {peak_mb:.1f} MB, budget {max_mb * BUDGET_SCALE:.1f} MB"
+    return app
+
+
+def test_login():
+    app = check_budget("login", login_page, submit_login)
+    assert app.session_state["logged_in"]
+    assert len(app.session_state["tradelog"]) == TRADES
+
+
+def test_journal_rerun():
+    check_budget("journal_rerun", open_page("Journal"), lambda app: None)
+
+
+def test_journal_add_trade():
+    app = check_budget("journal_add_trade", open_page("Journal"), add_trade)
+    assert len(app.session_state["tradelog"]) == TRADES + 1
+
+
+def test_journal_grid_page():
+    check_budget("journal_grid_page", open_page("Journal"),
+                 lambda app: app.number_input(key="tradelog_page").set_value(2))
+
+
+def test_journal_notes_search():
+    check_budget("journal_notes_search", open_page("Journal"),
+                 lambda app: app.text_input(key="notes_query").input("breakout held target"))
+
+
+def test_calendar_visit():
+    check_budget("calendar_visit", open_page("Journal"), visit("Calendar"))
+
+
+def test_calendar_month():
+    check_budget("calendar_month", open_page("Calendar"), previous_month)
+
+
+def test_dashboard_visit():
+    check_budget("dashboard_visit", open_page("Journal"), visit("Dashboard"))
+
+
+@pytest.mark.parametrize("panel", ["Performance", "Analytics", "Evaluation"])
+def test_dashboard_panel(panel):
+    check_budget(f"dashboard_{panel.lower()}", open_page("Dashboard"), dashboard_panel(panel))
+
+
+def test_reporting_visit():
+    check_budget("reporting_visit", open_page("Journal"), visit("Reporting"))
+
+
+@pytest.mark.parametrize("period", ["Quarterly", "Annual"])
+def test_reporting_period(period):
+    check_budget(f"reporting_{period.lower()}", open_page("Reporting"),
+                 selectbox("Select Reporting Period", period))
+
+
+def test_reporting_month():
+    check_budget("reporting_month", open_page("Reporting"), previous_month)
@@ -0,0 +1,71 @@
+import math
+
+import pandas as pd
+
+from search import BM25_B, BM25_K1, NotesIndex, NotesIndexCache
+
+# BM25 ranking of the trade notes
+NOTES = pd.DataFrame({
+    "Trade ID": [1, 2, 3, 4],
+    "Notes": ["breakout held target", "chased the entry", "breakout failed breakout", ""],
+})
+
+
+def test_score_matches_bm25_formula():
+    index = NotesIndex(NOTES)
+    ranked = dict(index.search("breakout"))
+
+    documents, matches = 3, 2  # Trade 4 has no notes and isn't indexed
+    average_length = (3 + 2 + 3) / documents  # "the" is a stop word
+    idf = math.log(1 + (documents - matches + 0.5) / (matches + 0.5))
+
+    def score(frequency, length):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+        return idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+    assert set(ranked) == {1, 3}
+    assert math.isclose(ranked[1], score(1, 3))
+    assert math.isclose(ranked[3], score(2, 3))
+
+
+def test_more_occurrences_rank_first():
+    assert [trade_id for trade_id, _ in NotesIndex(NOTES).search("breakout")] == [3, 1]
+
+
+def test_stop_words_and_unknown_terms_match_nothing():
+    index = NotesIndex(NOTES)
+    assert index.search("the") == []
+    assert index.search("gap fill") == []
+
+
+def test_duplicate_trade_id_is_indexed_with_its_last_notes():
+    index = NotesIndex(pd.DataFrame({"Trade ID": [7, 7], "Notes": ["old idea", "new idea"]}))
+    assert index.search("old") == []
+    assert [trade_id for trade_id, _ in index.search("new")] == [7]
+
+
+def ranked_ids(index, query):
+    return [trade_id for trade_id, _ in index.search(query)]
+
+
+def test_edit_reindexes_only_changed_trades(monkeypatch):
+    cache = NotesIndexCache()
+    before = cache.get(NOTES, version=1)
+
+    edited = NOTES.copy()
+    edited.loc[edited["Trade ID"] == 2, "Notes"] = "breakout chased"
+    edited = edited[edited["Trade ID"] != 3]
+    added, add = [], NotesIndex.add
+    monkeypatch.setattr(NotesIndex, "add", lambda self, trade_id, text: (
+        added.append(trade_id), add(self, trade_id, text)))
+    after = cache.get(edited, version=2, previous=1)
+
+    assert added == [2]
+    assert set(ranked_ids(after, "breakout")) == {1, 2}
+    assert ranked_ids(after, "entry") == []
+    assert 1 not in cache and 2 in cache
+    monkeypatch.undo()
+    assert after.search("breakout") == NotesIndex(edited).search("breakout")
+    # The old version's index is left as it was for anyone still searching it
+    assert ranked_ids(before, "breakout") == [3, 1]
+    assert ranked_ids(before, "entry") == [2]
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bitmaps import positions
+from tags import TagIndex, parse_tags, tokenize
+
+# Tag query parser and tag bitmaps, against the same queries evaluated with pandas
+TRADES = pd.DataFrame({"Tags": ["news day, scaled in", "news day", "A+ setup, Revenge",
+                                "scaled in, revenge", "", "News Day, a+ setup"]})
+
+
+def rows(index, query):
+    return positions(index.query(query), index.n).tolist()
+
+
+def has(tag):
+    return TRADES["Tags"].map(lambda value: tag in parse_tags(value)).to_numpy()
+
+
+def expected(mask):
+    return np.flatnonzero(mask).tolist()
+
+
+def test_parse_tags_normalizes_and_deduplicates():
+    assert parse_tags(" News  Day, news day,, Scaled In ") == ["news day", "scaled in"]
+    assert parse_tags(None) == []
+
+
+def test_tokenize_joins_words_into_tags():
+    assert tokenize('news day AND NOT "a+ setup" | (x)') == [
+        ("tag", "news day"), ("op", "&"), ("op", "!"), ("tag", "a+ setup"), ("op", "|"),
+        ("(", "("), ("tag", "x"), (")", ")")]
+
+
+def test_not_binds_tighter_than_and_which_binds_tighter_than_or():
+    index = TagIndex(TRADES)
+    assert rows(index, "revenge OR news day AND NOT scaled in") == \
+        expected(has("revenge") | (has("news day") & ~has("scaled in")))
+
+
+def test_parentheses_override_precedence():
+    index = TagIndex(TRADES)
+    assert rows(index, "(revenge | news day) & !scaled in") == \
+        expected((has("revenge") | has("news day")) & ~has("scaled in"))
+
+
+def test_empty_query_matches_every_trade():
+    index = TagIndex(TRADES)
+    assert rows(index, "  ") == list(range(len(TRADES)))
+
+
+@pytest.mark.parametrize("query", ["news day AND", "(revenge", "revenge )", "& revenge"])
+def test_malformed_queries_raise(query):
+    with pytest.raises(ValueError):
+        TagIndex(TRADES).query(query)
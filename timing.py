@@ -0,0 +1,168 @@
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from metrics import PAGE_RUNS, PAGE_RUN_SECONDS
+from lazy_imports import IMPORT_SECONDS
+
+# Section timings of runs with timings enabled are appended here as one JSON object
+# per line, for offline analysis
+TIMINGS_LOG_PATH = os.path.join(os.getcwd(), "timings.log")
+TIMINGS_LOG_MAX_BYTES = 5 * 2 ** 20
+TIMINGS_LOG_BACKUPS = 3
+
+# The sidebar panel is opt-in: set JOURNAL_DEBUG=1 or open a page with ?debug=1
+DEBUG_ENV = "JOURNAL_DEBUG"
+
+# Nested sections are recorded under "Outer / Inner"
+SECTION_SEPARATOR = " / "
+
+_logger = logging.getLogger("journal.timing")
+_logger_lock = threading.Lock()
+
+
+# Script threads only put records on a queue; a listener thread writes them to the
+# file, so a run never waits on the disk or the handler's lock
+def _get_logger():
+    with _logger_lock:
+        if not _logger.handlers:
+            handler = RotatingFileHandler(TIMINGS_LOG_PATH, maxBytes=TIMINGS_LOG_MAX_BYTES,
+                                          backupCount=TIMINGS_LOG_BACKUPS)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            records = queue.SimpleQueue()
+            listener = QueueListener(records, handler)
+            listener.start()
+            atexit.register(listener.stop)  # Write what's still queued on shutdown
+            _logger.addHandler(QueueHandler(records))
+            _logger.setLevel(logging.INFO)
+            _logger.propagate = False
+    return _logger
+
+
+def timings_enabled():
+    return os.environ.get(DEBUG_ENV) == "1" or st.query_params.get("debug") == "1"
+
+
+# Called once per script run (from make_sidebar) with the page being rendered; the
+# previous run's sections are kept for the panel. Sections go to the timings log only
+# in runs with timings enabled.
+def start_run(page):
+    PAGE_RUNS.inc(page=page)
+    st.session_state["timing_started"] = time.perf_counter()
+    st.session_state["timing_logged"] = timings_enabled()
+    st.session_state["timing_last_page"] = st.session_state.get("timing_page", "")
+    st.session_state["timing_last_run"] = st.session_state.get("timing_run", [])
+    st.session_state["timing_page"] = page
+    st.session_state["timing_run"] = []
+    st.session_state["timing_stack"] = []
+
+
+# Called at the end of a page script. Runs cut short by a rerun, st.stop() or
+# st.switch_page don't get here and aren't counted in the run latency.
+def finish_run():
+    started = st.session_state.pop("timing_started", None)
+    if started is not None:
+        PAGE_RUN_SECONDS.observe(time.perf_counter() - started,
+                                 page=st.session_state.get("timing_page", ""))
+
+
+def _record(section, seconds, ctx):
+    page = st.session_state.get("timing_page", "")
+    # {page: {section: [count, total seconds, max seconds]}}, for the whole session
+    stats = st.session_state.setdefault("timings", {}).setdefault(page, {}) \
+        .setdefault(section, [0, 0.0, 0.0])
+    stats[0] += 1
+    stats[1] += seconds
+    stats[2] = max(stats[2], seconds)
+    st.session_state.setdefault("timing_run", []).append((section, seconds))
+
+    if not st.session_state.get("timing_logged", False):
+        return
+    _get_logger().info(json.dumps({
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "session": ctx.session_id,
+        "page": page,
+        "section": section,
+        "seconds": round(seconds, 6),
+    }))
+
+
+# Time a section of a page run:
+#   with timed("Metrics"):
+#       ...
+# Outside a Streamlit script run (benchmarks, scripts) the section just runs.
+@contextmanager
+def timed(section):
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        yield
+        return
+
+    stack = st.session_state.setdefault("timing_stack", [])
+    stack.append(section)
+    name = SECTION_SEPARATOR.join(stack)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        if stack and stack[-1] == section:
+            stack.pop()
+        _record(name, seconds, ctx)
+
+
+# Decorator form of timed(); the section defaults to the function's name
+def timed_function(section=None):
+    def decorate(function):
+        name = section or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# Sidebar panel with the sections of the previous run and the totals for this page
+# and the whole session
+def render_timing_panel():
+    last_run = st.session_state.get("timing_last_run", [])
+    last_page = st.session_state.get("timing_last_page", "")
+    page = st.session_state.get("timing_page", "")
+    timings = st.session_state.get("timings", {})
+
+    with st.expander("Render timings"):
+        st.caption(f"Previous run ({last_page})")
+        if last_run:
+            st.dataframe(pd.DataFrame(last_run, columns=["Section", "Seconds"]),
+                         hide_index=True, use_container_width=True)
+
+        rows = [{"Section": section, "Runs": count, "Mean": total / count, "Max": longest,
+                 "Total": total} for section, (count, total, longest) in
+                timings.get(page, {}).items()]
+        if rows:
+            st.caption(f"{page}, this session")
+            st.dataframe(pd.DataFrame(rows).sort_values("Total", ascending=False),
+                         hide_index=True, use_container_width=True)
+
+        session_total = sum(total for sections in timings.values()
+                            for section, (count, total, longest) in sections.items()
+                            if SECTION_SEPARATOR not in section)
+        st.caption(f"Session total, all pages: {session_total:.2f} s")
+
+        if IMPORT_SECONDS:
+            st.caption("Deferred imports, this server process")
+            st.dataframe(pd.DataFrame(list(IMPORT_SECONDS.items()), columns=["Module", "Seconds"]),
+                         hide_index=True, use_container_width=True)
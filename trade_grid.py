@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from trade_store import get_tradelog, get_version
+
+# Rows per page offered by the Trade Log grid
+PAGE_SIZES = [25, 50, 100, 250]
+
+# Column the grid uses to match edited rows back to the tradelog
+KEY_COLUMN = "Trade ID"
+
+
+# Row positions of the tradelog sorted by `column`, computed once per tradelog
+# version and shared between sessions (the underscore keeps the frame unhashed).
+# Missing values always sort last; ties keep their original order.
+@st.cache_resource(max_entries=32, show_spinner=False)
+def sort_order(_tradelog, version, column, ascending):
+    tradelog = _tradelog
+    if column not in tradelog.columns:
+        return np.arange(len(tradelog))
+    values = tradelog[column].reset_index(drop=True)
+    return values.sort_values(ascending=ascending, kind="stable",
+                              na_position="last").index.to_numpy()
+
+
+def page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+
+# Rows shown on `page` (1-based) for the given sort order
+def page_rows(tradelog, order, page, page_size):
+    start = (page - 1) * page_size
+    return tradelog.iloc[order[start:start + page_size]]
+
+
+# Page (1-based) that shows `trade_id` in the given sort order, or None if the trade doesn't exist
+def page_of_trade(tradelog, order, trade_id, page_size):
+    matches = np.flatnonzero(tradelog[KEY_COLUMN].to_numpy() == trade_id)
+    if len(matches) == 0:
+        return None
+    position = int(np.flatnonzero(order == matches[0])[0])
+    return position // page_size + 1
+
+
+# Write the rows of an edited page back into the tradelog, matching them by Trade ID.
+# Only the page's rows are touched. Returns the row positions whose value changed, by
+# column, for the columns the edit changed.
+def merge_page_edits(tradelog, edited_page):
+    positions = pd.Index(tradelog[KEY_COLUMN]).get_indexer(edited_page[KEY_COLUMN])
+    found = positions >= 0
+    positions = positions[found]
+    edited_page = edited_page[found]
+
+    changed = {}
+    for column in edited_page.columns:
+        if column == KEY_COLUMN or column not in tradelog.columns:
+            continue
+        values = edited_page[column].to_numpy()
+        target = tradelog.columns.get_loc(column)
+        before = tradelog.iloc[positions, target].reset_index(drop=True)
+        after = pd.Series(values)
+        differs = ~(before.eq(after) | (before.isna() & after.isna()))
+        if not differs.any():
+            continue
+        changed[column] = positions[differs.to_numpy()]
+        try:
+            tradelog.iloc[positions, target] = values
+        except (TypeError, ValueError):
+            # The edit doesn't fit the column's dtype (e.g. text typed into a number column)
+            tradelog[column] = tradelog[column].astype(object)
+            tradelog.iloc[positions, target] = values
+    return changed
+
+
+# The grid's widget callbacks are defined here rather than in the page: Streamlit keeps
+# a widget's callback and its arguments after the page has moved on, and a function
+# defined in the page would keep the page's globals, the tradelog among them, alive.
+
+# Record that the editor changed the data, so the edit gets a new version
+def mark_tradelog_edited():
+    st.session_state['tradelog_edited'] = True
+
+
+# Move the grid to the page holding the requested Trade ID
+def jump_to_trade(sort_column, ascending, page_size):
+    tradelog = get_tradelog()
+    order = sort_order(tradelog, get_version(), sort_column, ascending)
+    page = page_of_trade(tradelog, order, st.session_state['tradelog_jump_id'], page_size)
+    if page is None:
+        st.session_state['tradelog_jump_missing'] = True
+    else:
+        st.session_state['tradelog_page'] = page
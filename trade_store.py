@@ -0,0 +1,179 @@
+import itertools
+import os
+import threading
+import time
+from io import StringIO
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from tags import TAGS_COLUMN
+from search import NOTES_COLUMN
+from lazy_imports import lazy_import
+from metrics import LOADER_REQUESTS, LOADER_MISSES, FETCH_SECONDS, WRITE_SECONDS, STORE_ROWS
+
+# Only needed when the tradelog comes from a URL
+requests = lazy_import("requests")
+
+TRADELOG_URL = 'https://raw.githubusercontent.com/hmh0490/streamlit-journal/refs/heads/master/tradelog_updated.csv'
+
+# Set to a URL or a local CSV path to load another tradelog, e.g. a test fixture
+TRADELOG_SOURCE_ENV = "JOURNAL_TRADELOG_SOURCE"
+
+file_path = os.path.join(os.getcwd(), "tradelog_updated.csv")
+
+# Edited tradelogs of idle sessions are written here while they are evicted from memory
+SPILL_DIR = os.path.join(os.getcwd(), "session_spill")
+
+# Versions are drawn from one process-wide counter, so a version number identifies
+# the same data in every session and can key caches shared between sessions
+_versions = itertools.count(1)
+_versions_lock = threading.Lock()
+
+# Versions handed out for the shared copy; a session still on one of these hasn't
+# changed its tradelog
+_shared_versions = set()
+
+
+def next_version():
+    with _versions_lock:
+        return next(_versions)
+
+
+# Parse columns once when data enters the store, so pages don't redo it every rerun
+def normalize(tradelog):
+    if tradelog is None:
+        return tradelog
+    if "Date" in tradelog.columns:
+        tradelog["Date"] = pd.to_datetime(tradelog["Date"], errors='coerce')
+    # Every trade can carry tags and notes; logs without the columns start empty
+    for column in (TAGS_COLUMN, NOTES_COLUMN):
+        if column in tradelog.columns:
+            tradelog[column] = tradelog[column].fillna("").astype(str)
+        else:
+            tradelog[column] = ""
+    return tradelog
+
+
+def tradelog_source():
+    return os.environ.get(TRADELOG_SOURCE_ENV) or TRADELOG_URL
+
+
+# Download and parse the tradelog once per process; every session starts from this copy
+@st.cache_resource(show_spinner="Loading trade log...")
+def _load_shared(source):
+    LOADER_MISSES.inc(loader="tradelog")
+    start = time.perf_counter()
+    if not source.startswith(("http://", "https://")):
+        tradelog = pd.read_csv(source)
+        FETCH_SECONDS.observe(time.perf_counter() - start, source="file")
+    else:
+        response = requests.get(source)
+        if response.status_code != 200:
+            raise ConnectionError(f"GitHub returned status {response.status_code}")
+        tradelog = pd.read_csv(StringIO(response.text))
+        FETCH_SECONDS.observe(time.perf_counter() - start, source="remote")
+    STORE_ROWS.set(len(tradelog), store="shared")
+    version = next_version()
+    _shared_versions.add(version)
+    return normalize(tradelog), version
+
+
+def load_data():
+    LOADER_REQUESTS.inc(loader="tradelog")
+    source = tradelog_source()
+    try:
+        tradelog, version = _load_shared(source)
+    except Exception:
+        st.error("Failed to load data from GitHub." if source == TRADELOG_URL else
+                 f"Failed to load data from {source}.")
+        return None, None
+    # Pages add columns to their frame, so each session gets its own copy
+    return tradelog.copy(), version
+
+
+# Write the tradelog to the local file every session saves to
+def save_tradelog(tradelog):
+    start = time.perf_counter()
+    tradelog.to_csv(file_path, index=False)
+    WRITE_SECONDS.observe(time.perf_counter() - start)
+    STORE_ROWS.set(len(tradelog), store="file")
+
+
+# Where an idle session's edited tradelog is kept while it is evicted from memory
+def spill_path(session_id):
+    return os.path.join(SPILL_DIR, f"{session_id}.pkl")
+
+
+# The tradelog prefetched at login, or None if there is none or it failed to load
+def _prefetched():
+    future = st.session_state.pop("tradelog_future", None)
+    if future is None:
+        return None
+    if not future.done():
+        with st.spinner("Loading trade log..."):
+            future.exception()
+    if future.exception() is not None:
+        return None
+    return future.result()
+
+
+# Return the session's tradelog, loading it on first access or after it was evicted
+def get_tradelog():
+    if "tradelog" not in st.session_state:
+        prefetched = _prefetched()
+        ctx = get_script_run_ctx()
+        spilled = spill_path(ctx.session_id) if ctx is not None else None
+        if spilled is not None and os.path.exists(spilled):
+            # Edited log of a session that was idle: read back, same version as before
+            st.session_state["tradelog"] = pd.read_pickle(spilled)
+            os.remove(spilled)
+        elif prefetched is not None:
+            st.session_state["tradelog"], st.session_state["tradelog_version"] = prefetched
+        else:
+            st.session_state["tradelog"], st.session_state["tradelog_version"] = load_data()
+    return st.session_state["tradelog"]
+
+
+# Drop the session's tradelog from memory; called from the session's own run. An
+# unchanged log is copied from the shared one again on next access; an edited one is
+# written to disk first and read back then. Returns whether anything was released.
+def release_tradelog():
+    ctx = get_script_run_ctx()
+    if ctx is None or "tradelog" not in st.session_state:
+        return False
+    tradelog = st.session_state["tradelog"]
+    if tradelog is not None and st.session_state.get("tradelog_version") not in _shared_versions:
+        os.makedirs(SPILL_DIR, exist_ok=True)
+        tradelog.to_pickle(spill_path(ctx.session_id))
+    del st.session_state["tradelog"]
+    return True
+
+
+# Spilled log of a session that has ended
+def discard_spill(session_id):
+    try:
+        os.remove(spill_path(session_id))
+    except FileNotFoundError:
+        pass
+
+
+# Version of the session's tradelog; changes on every insert, edit, delete or import,
+# and stays the same across reruns that don't touch the data
+def get_version():
+    get_tradelog()
+    if st.session_state.get("tradelog_version") is None:
+        bump_version()
+    return st.session_state["tradelog_version"]
+
+
+def bump_version():
+    st.session_state["tradelog_version"] = next_version()
+    return st.session_state["tradelog_version"]
+
+
+# Replace the session's tradelog after a change and give it a new version
+def set_tradelog(tradelog):
+    st.session_state["tradelog"] = normalize(tradelog)
+    return bump_version()